@@ -1,13 +1,18 @@
-import json
 import os
 import re
 import sys
 
 # This allows for importing from the localization and util directories NOTE: Auto importing tools will also prepend the import paths with "tools." this will not work and needs to be removed from import paths
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from util.jsonUtils import dumpsJson
 from util.listUtils import missingFromList
 from util.logger import console
 
+# The patterns used to find dynamic variables in a string. These are shared with the type generation so both agree on
+# what a variable is.
+DYNAMIC_VARIABLE_PATTERN = r"\{(\w+)\}"
+OLD_DYNAMIC_VARIABLE_PATTERN = r"\$(\w+)\$"
+
 
 def extractAllMatches(input_string, pattern):
   """
@@ -35,8 +40,7 @@ def extractOldDynamicVariables(input_string):
   Returns:
     list: A list of dynamic variables found in the input string.
   """
-  pattern = r"\$(\w+)\$"
-  matches = re.findall(pattern, input_string)
+  matches = re.findall(OLD_DYNAMIC_VARIABLE_PATTERN, input_string)
   return matches
 
 
@@ -55,8 +59,8 @@ def extractVariablesFromDict(input_dict):
   output_dict_old = {}
   for key, value in input_dict.items():
     console.debug(f"key: {key}, value: {value}")
-    output_dict_new[key] = extractAllMatches(value, r"\{(\w+)\}")
-    output_dict_old[key] = extractAllMatches(value, r"\$(\w+)\$")
+    output_dict_new[key] = extractAllMatches(value, DYNAMIC_VARIABLE_PATTERN)
+    output_dict_old[key] = extractAllMatches(value, OLD_DYNAMIC_VARIABLE_PATTERN)
   return output_dict_new, output_dict_old
 
 
@@ -180,12 +184,16 @@ def extractFormattingTags(input_dict):
 
 def identifyLocaleDynamicVariableDifferences(locales, locale_b_tags,
                                              locale_br_tags,
-                                             locale_span_tags, locale_disallowed_tags, locale_improper_tags):
+                                             locale_span_tags, locale_disallowed_tags, locale_improper_tags,
+                                             locale_signatures=None):
   """
   Identifies the differences between each locale's dynamic variables.
 
   Args:
     locales (dict): A dictionary with keys being a locale name and values being a dictionary of locales.
+    locale_signatures (dict): Optional, a dictionary with keys being a locale name and values being a dictionary of
+      signature hashes (see LocaleCorpus.signatureHashes). When given, strings with the same signature as en are
+      skipped instead of being compared in detail.
 
   Returns:
     dict: A dictionary with the same keys as locales, but the values are dictionaries of issues.
@@ -194,6 +202,11 @@ def identifyLocaleDynamicVariableDifferences(locales, locale_b_tags,
   master_locale_b_tags = locale_b_tags["en"]
   master_locale_br_tags = locale_br_tags["en"]
   master_locale_span_tags = locale_span_tags["en"]
+  master_locale_signatures = locale_signatures["en"] if locale_signatures else None
+  # A string matching the en signature can only have an issue if en itself has disallowed or improper tags
+  master_locale_clean = {
+    key: not locale_disallowed_tags["en"][key] and not locale_improper_tags["en"][key] for key in master_locale
+  }
   issues = {}
 
   for locale_name, locale in locales.items():
@@ -202,6 +215,7 @@ def identifyLocaleDynamicVariableDifferences(locales, locale_b_tags,
     current_locale_span_tags = locale_span_tags[locale_name]
     current_locale_disallowed_tags = locale_disallowed_tags[locale_name]
     current_locale_improper_tags = locale_improper_tags[locale_name]
+    current_locale_signatures = locale_signatures[locale_name] if locale_signatures else None
     if locale_name == "en":
       continue
 
@@ -221,78 +235,61 @@ def identifyLocaleDynamicVariableDifferences(locales, locale_b_tags,
       # If a key is missing from the locale, add it to the missing_keys list
       if key not in locale:
         locale_issues["missing_keys"].append(key)
+      elif (
+        current_locale_signatures is not None
+        and master_locale_clean[key]
+        and current_locale_signatures[key] == master_locale_signatures[key]
+      ):
+        continue
       else:
 
         locale_value = locale[key]
 
-        # Find the dynamic variables that are missing from the locale. If there are none this will set the value to an empty list.
-        locale_issues["missing_variables"][key] = missingFromList(
-          value, locale_value
+        # Only the non-empty findings are recorded so the issues stay proportional to the number of actual problems.
+        # Find the dynamic variables that are missing from the locale.
+        missing_variables = missingFromList(value, locale_value)
+        if missing_variables:
+          locale_issues["missing_variables"][key] = missing_variables
+
+        # Find the dynamic variables that are additional to the locale.
+        additional_variables = missingFromList(locale_value, value)
+        if additional_variables:
+          locale_issues["additional_variables"][key] = additional_variables
+
+        tag_counts = (
+          ("missing_b_tags", len(master_locale_b_tags[key]) - len(current_locale_b_tags[key])),
+          ("missing_br_tags", len(master_locale_br_tags[key]) - len(current_locale_br_tags[key])),
+          ("missing_span_tags", len(master_locale_span_tags[key]) - len(current_locale_span_tags[key])),
+          ("disallowed_tags", len(current_locale_disallowed_tags[key])),
+          ("improper_tags", len(current_locale_improper_tags[key])),
         )
-
-        # Find the dynamic variables that are additional to the locale. If there are none this will set the value to an empty list.
-        locale_issues["additional_variables"][key] = missingFromList(
-          locale_value, value
-        )
-
-        locale_issues["missing_b_tags"][key] = len(master_locale_b_tags[key]) - len(current_locale_b_tags[key])
-        locale_issues["missing_br_tags"][key] = len(master_locale_br_tags[key]) - len(current_locale_br_tags[key])
-        locale_issues["missing_span_tags"][key] = len(master_locale_span_tags[key]) - len(current_locale_span_tags[key])
-        locale_issues["disallowed_tags"][key] = len(current_locale_disallowed_tags[key])
-        locale_issues["improper_tags"][key] = len(current_locale_improper_tags[key])
+        for issue_type, count in tag_counts:
+          if count != 0:
+            locale_issues[issue_type][key] = count
 
     for key in locale:
       if key not in master_locale:
         locale_issues["additional_keys"].append(key)
 
-    # Only add the locale to the issues if there are any issues
-    if (
-      locale_issues["missing_keys"]
-      or locale_issues["additional_keys"]
-      or locale_issues["missing_variables"]
-      or locale_issues["additional_variables"]
-    ):
-
-      # Remove empty lists from missing_variables
-      locale_issues["missing_variables"] = {
-        k: v for k, v in locale_issues["missing_variables"].items() if v
-      }
-
-      # Remove empty lists from additional_variables
-      locale_issues["additional_variables"] = {
-        k: v for k, v in locale_issues["additional_variables"].items() if v
-      }
-
-      # remove missing_keys if it's empty
-      if not locale_issues["missing_keys"]:
-        del locale_issues["missing_keys"]
-
-      # remove additional_keys if it's empty
-      if not locale_issues["additional_keys"]:
-        del locale_issues["additional_keys"]
-
-      # Remove missing_variables if it's empty
-      if not locale_issues["missing_variables"]:
-        del locale_issues["missing_variables"]
-
-      # Remove additional_variables if it's empty
-      if not locale_issues["additional_variables"]:
-        del locale_issues["additional_variables"]
+    # Remove the issue types without any findings
+    locale_issues = {issue_type: findings for issue_type, findings in locale_issues.items() if findings}
 
+    # Only add the locale to the issues if there are any issues
+    if locale_issues:
       console.debug_json(f"locale_issues:", locale_issues)
       issues[locale_name] = locale_issues
 
   return issues
 
 
-def prettyPrintIssuesTable(issues):
+def prettyPrintIssuesTable(issue_index):
   """
-  Pretty prints a table from the return of identifyLocaleDynamicVariableDifferences
+  Pretty prints a table from the index of the issues returned by identifyLocaleDynamicVariableDifferences
   where the rows are locale name and the columns are the issue types.
   Values will be number of occurrences of each issues.
 
   Args:
-    issues (dict): The issues dictionary returned from identifyLocaleDynamicVariableDifferences.
+    issue_index (IssueIndex): The index of the issues.
 
   """
 
@@ -313,18 +310,15 @@ def prettyPrintIssuesTable(issues):
     f"{'-' * 5 * PADDING:<{PADDING}}"
   )
 
-  for locale_name, locale_issues in issues.items():
+  for locale_name in issue_index.locales():
     if locale_name == "en":
       continue
 
-    missing_keys = len(locale_issues.get("missing_keys", []))
-    additional_keys = len(locale_issues.get("additional_keys", []))
-    missing_variables = sum(
-      len(v) for v in locale_issues.get("missing_variables", {}).values()
-    )
-    additional_variables = sum(
-      len(v) for v in locale_issues.get("additional_variables", {}).values()
-    )
+    totals = issue_index.localeTotals(locale_name)
+    missing_keys = totals["missing_keys"]
+    additional_keys = totals["additional_keys"]
+    missing_variables = totals["missing_variables"]
+    additional_variables = totals["additional_variables"]
 
     print(
       f"{locale_name:<{PADDING}}{missing_keys:<{PADDING}}{additional_keys:<{PADDING}}{missing_variables:<{PADDING}}{additional_variables:<{PADDING}}"
@@ -349,7 +343,7 @@ def identifyAndPrintOldDynamicVariables(
         found_problems = True
     if invalid_strings:
       console.warn(
-        f"{json.dumps(invalid_strings, indent=2, sort_keys=True) if printOldVariables else ''}"
+        f"{dumpsJson(invalid_strings, indent=2, sortKeys=True) if printOldVariables else ''}"
         f"\nLocale {locale_name} contains {len(invalid_strings)} strings with old dynamic variables. (see above)"
       )
   return found_problems
@@ -0,0 +1,86 @@
+#!/bin/python3
+import argparse
+import csv
+import os
+import sys
+
+# This allows for importing from the localization and util directories NOTE: Auto importing tools will also prepend the import paths with "tools." this will not work and needs to be removed from import paths
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from util.time import ExecutionTimer
+
+timer = ExecutionTimer()
+
+from localization.localeCorpus import LocaleCorpus
+from localization.nearDuplicates import findNearDuplicates, SHINGLE_SIZE, NUM_PERMUTATIONS, ROWS_PER_BAND
+from util.fileUtils import makeDirIfNotExists
+from util.logger import console
+
+parser = argparse.ArgumentParser(
+  description="Find the en strings that are identical or nearly identical once their dynamic variables and formatting "
+              "tags are removed, as candidates for consolidation."
+)
+parser.add_argument(
+  "--threshold",
+  type=float,
+  default=0.8,
+  help="The minimum similarity (Jaccard similarity of the character n-grams) of two near-duplicate strings",
+)
+parser.add_argument("--shingle-size", type=int, default=SHINGLE_SIZE, help="The length of the character n-grams")
+parser.add_argument("--permutations", type=int, default=NUM_PERMUTATIONS, help="The length of the MinHash signatures")
+parser.add_argument("--rows-per-band", type=int, default=ROWS_PER_BAND, help="The number of rows of each LSH band")
+parser.add_argument("--exact-only", action="store_true", help="Only report strings that are identical once normalized")
+parser.add_argument("--limit", type=int, default=20, help="The number of clusters to print, 0 to print all of them")
+parser.add_argument(
+  "--output-file",
+  type=str,
+  default="./tools/localization/analysis/duplicate_strings.csv",
+  help="The CSV file to write every cluster to",
+)
+parser.add_argument("--dict-dir", type=str, default="./_locales")
+parser.add_argument("--debug", action="store_true", help="Enable debug mode")
+
+args = parser.parse_args()
+
+if args.debug:
+  console.enableDebug()
+
+corpus = LocaleCorpus(args.dict_dir)
+clusters = findNearDuplicates(
+  corpus.master, args.threshold, args.shingle_size, args.permutations, args.rows_per_band
+)
+if args.exact_only:
+  clusters = [cluster for cluster in clusters if cluster["exact"]]
+
+
+def key_bytes(key):
+  # The size of a key across every locale, which is what consolidating it would save
+  return sum(len(corpus.locale(locale).get(key, "").encode("utf-8")) for locale in corpus.localeNames())
+
+
+makeDirIfNotExists(args.output_file)
+total_saving = 0
+with open(args.output_file, "w", encoding="utf-8", newline="") as csvfile:
+  csvwriter = csv.writer(csvfile)
+  csvwriter.writerow(["Cluster", "Exact", "Similarity", "Key", "String", "Bytes"])
+  for index, cluster in enumerate(clusters, start=1):
+    sizes = {key: key_bytes(key) for key in cluster["keys"]}
+    # All but one of the keys of a cluster could be removed
+    cluster["saving"] = sum(sizes.values()) - max(sizes.values())
+    total_saving += cluster["saving"]
+    for key in cluster["keys"]:
+      csvwriter.writerow([index, cluster["exact"], f"{cluster['similarity']:.2f}", key, corpus.master[key], sizes[key]])
+
+for index, cluster in enumerate(clusters[:args.limit] if args.limit else clusters, start=1):
+  kind = "exact" if cluster["exact"] else f"similarity >= {cluster['similarity']:.2f}"
+  console.info(f"Cluster {index} ({len(cluster['keys'])} keys, {kind}, saves {cluster['saving']} bytes)")
+  for key in cluster["keys"]:
+    console.info(f"  {key:<50} | {corpus.master[key]}")
+
+duplicate_keys = sum(len(cluster["keys"]) - 1 for cluster in clusters)
+console.info(
+  f"Found {len(clusters)} clusters of duplicate strings, consolidating them would remove {duplicate_keys}/"
+  f"{len(corpus.master)} keys and {total_saving} bytes across {len(corpus.localeNames())} locales")
+console.info(f"Clusters written to: {args.output_file}")
+
+timer.stop()
@@ -2,10 +2,14 @@
 import argparse
 import os
 import sys
+import time
 
 # This allows for importing from the localization and util directories NOTE: Auto importing tools will also prepend the import paths with "tools." this will not work and needs to be removed from import paths
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-from localization.regex import localization_regex
+from localization.regex import localization_regex_as_list
+from localization.localeCorpus import LocaleCorpus
+from localization.sourceUsage import find_source_files, search_string_in_regex_list
+from localization.textIndex import TextIndex
 
 
 # Create the parser
@@ -14,7 +18,30 @@ parser = argparse.ArgumentParser(
 )
 
 # Add the arguments
-parser.add_argument("Token", metavar="token", type=str, help="the token to search for")
+parser.add_argument("Token", metavar="token", type=str, help="the token to search for, or the text with --text")
+parser.add_argument(
+    "-t",
+    "--text",
+    action="store_true",
+    help="Find the keys whose value contains the text, in any locale",
+)
+parser.add_argument(
+    "-f",
+    "--fuzzy",
+    action="store_true",
+    help="With --text, find the values most similar to the text instead of the ones containing it",
+)
+parser.add_argument(
+    "--locale",
+    action="append",
+    help="With --text, only search this locale (e.g. fr or zh_CN). Can be passed several times",
+)
+parser.add_argument(
+    "--max-results",
+    type=int,
+    default=50,
+    help="With --text, the maximum number of results to print",
+)
 parser.add_argument(
     "-o", "--open", action="store_true", help="Open the results in VSCode"
 )
@@ -35,23 +62,37 @@ OPEN_IN_VSCODE = args.open
 NUMBER_OF_FILES_LIMIT = args.limit
 
 
-def find_token_uses(token, root_dir="./ts/", exclude_files=EXCLUDE_FILES):
-    regex = localization_regex(token)
+def find_token_uses(token, exclude_files=EXCLUDE_FILES):
+    regex_list = localization_regex_as_list(token)
     matches = []
 
-    for root, dirs, files in os.walk(root_dir):
-        for file in files:
-            if file.endswith((".tsx", ".ts")) and file not in exclude_files:
-                file_path = os.path.join(root, file)
-                with open(file_path, "r", encoding='utf-8') as f:
-                    for line_no, line in enumerate(f, start=1):
-                        if regex.search(line):
-                            matches.append(f"{file_path}:{line_no}")
+    for file_path in find_source_files():
+        if os.path.basename(file_path) in exclude_files:
+            continue
+        with open(file_path, "r", encoding='utf-8') as f:
+            for line_no, line in enumerate(f, start=1):
+                if search_string_in_regex_list(regex_list, line):
+                    matches.append(f"{file_path}:{line_no}")
 
     return matches
 
 
-import os
+if args.text:
+    # The index is persisted and only the locale files that changed since the last search are re-indexed
+    text_index = TextIndex.load(LocaleCorpus())
+    search_start = time.perf_counter()
+    if args.fuzzy:
+        results = text_index.fuzzySearch(TOKEN, args.locale, args.max_results)
+    else:
+        results = [(key, locale, value, None) for key, locale, value in
+                   text_index.search(TOKEN, args.locale, args.max_results)]
+    search_time = time.perf_counter() - search_start
+
+    for key, locale, value, score in results:
+        score_info = f" ({score:.0%})" if score is not None else ""
+        print(f"{key:<50} | {locale:<6} | {value}{score_info}".replace("\n", "\\n"))
+    print(f"Found {len(results)} values for '{TOKEN}' in {search_time * 1000:.1f} ms")
+    sys.exit(0)
 
 matches = find_token_uses(TOKEN)
 if matches:
@@ -1,6 +1,5 @@
 #!/bin/python3
 import argparse
-import json
 import os
 import sys
 
@@ -11,15 +10,41 @@ from util.time import ExecutionTimer;
 
 timer = ExecutionTimer()
 
-from dynamicVariables import (
-  extractVariablesFromDict,
+from localization.dynamicVariables import (
   identifyLocaleDynamicVariableDifferences,
   prettyPrintIssuesTable,
-  identifyAndPrintOldDynamicVariables, extractFormattingTags,
+  identifyAndPrintOldDynamicVariables,
 )
-from localization.localeTypes import generateLocalesType, generateLocalesMergedType
+from localization.issueIndex import IssueIndex, crowdinLink
+from localization.localeChanges import changedLocaleKeys
+from localization.localeCorpus import LocaleCorpus
+from localization.localeTypes import (
+  generateLocalesType,
+  generateLocalesMergedType,
+  generateLocalesChunkedType,
+  patchLocalesMergedType,
+  load_critical_entries,
+  load_keep_tokens,
+  select_tree_shaken_keys,
+  CRITICAL_ENTRIES_FILE,
+  CRITICAL_IMPORT_DEPTH,
+  CRITICAL_OUTPUT_FILE,
+  DEFERRED_OUTPUT_FILE,
+  KEEP_TOKENS_FILE,
+  OUTPUT_FILE,
+)
+from localization.localeSizes import (
+  LocaleSizeReport,
+  printSizeSummary,
+  loadSizeBudgets,
+  checkSizeBudgets,
+  SIZE_REPORT_FILE,
+)
+from localization.sourceUsage import findReferencedKeys, find_component_call_sites, find_reachable_files
 from util.logger import console
-from util.fileUtils import createMappedJsonFileDictionary, writeFile
+from util.fileUtils import writeFile
+from util.jsonUtils import dumpsJson, loadJson
+from util.shardUtils import parseShard, selectShard, shardFilePath, findShardFiles
 
 # These string keys are ignored for formatting tag checks
 ignored_strings_formatting = {
@@ -97,173 +122,293 @@ parser.add_argument(
   action="store_true",
   help="Generate the types file",
 )
-
-args = parser.parse_args()
-
-if args.debug:
-  console.enableDebug()
-
-GENERATE_TYPES = args.generate_types
-OUTPUT_DIR = "./ts/localization"
-EN_FILE = args.en_file_path
-INPUT_DIR = args.dict_dir
-
-# Create a dictionary that maps locale names to their corresponding JSON file data
-locales, localeFiles = createMappedJsonFileDictionary(INPUT_DIR, args.dict_file_name)
-
-if args.en_only:
-  locales = {"en": locales["en"]}
-
-# Generate the locales type and write it to a file
-if GENERATE_TYPES:
-  generateTypesOutputMessage = generateLocalesMergedType(locales)
-  console.info(generateTypesOutputMessage)
-
-localeVariables = dict()
-localeVariablesOld = dict()
-locale_b_tags = dict()
-locale_br_tags = dict()
-locale_span_tags = dict()
-locale_disallowed_tags = dict()
-locale_improper_tags = dict()
-# Extract the dynamic variables from each locale and store them in a dictionary
-for locale, data in locales.items():
-  console.debug(f"Extracting dynamic variables for {locale}")
-  (
-    localeVariables[locale],
-    localeVariablesOld[locale],
-  ) = extractVariablesFromDict(data)
-  (
-    locale_b_tags[locale],
-    locale_br_tags[locale],
-    locale_span_tags[locale],
-    locale_disallowed_tags[locale],
-    locale_improper_tags[locale],
-  ) = extractFormattingTags(data)
-
-problems = identifyLocaleDynamicVariableDifferences(localeVariables, locale_b_tags,
-                                                    locale_br_tags,
-                                                    locale_span_tags, locale_disallowed_tags, locale_improper_tags)
-
-found_old_dynamic_variables = identifyAndPrintOldDynamicVariables(
-  localeVariablesOld, args.print_old_dynamic_variables
+parser.add_argument(
+  "--disable-concurrency",
+  action="store_true",
+  help="Generate the types in a single process",
+)
+parser.add_argument(
+  "--incremental",
+  action="store_true",
+  help="Only regenerate the types of the keys that changed since the last generation and patch them into the file. "
+       "Falls back to a full generation when keys were added or removed, or with --size-report or --size-budgets",
+)
+parser.add_argument(
+  "--tree-shake",
+  action="store_true",
+  help="Only generate the types for the keys referenced in the source code, for production builds",
+)
+parser.add_argument(
+  "--keep-tokens",
+  type=str,
+  default=KEEP_TOKENS_FILE,
+  help="A file of tokens (or glob patterns) to keep when tree shaking, for tokens that are built at runtime",
+)
+parser.add_argument(
+  "--split-critical",
+  action="store_true",
+  help="Split the types into a critical chunk with the strings used by the components rendered on startup and a "
+       "deferred chunk with every other string",
+)
+parser.add_argument(
+  "--critical-entries",
+  type=str,
+  default=CRITICAL_ENTRIES_FILE,
+  help="A file of the entry files of the components rendered on startup, one per line",
+)
+parser.add_argument(
+  "--critical-depth",
+  type=int,
+  default=CRITICAL_IMPORT_DEPTH,
+  help="The number of imports followed from the critical entry files, -1 to follow every import",
+)
+parser.add_argument(
+  "--size-report",
+  action="store_true",
+  help="Print the size of the generated types by locale and key, and write the full report to the size report file",
+)
+parser.add_argument(
+  "--size-report-file",
+  type=str,
+  default=SIZE_REPORT_FILE,
+  help="The file to write the size report to",
+)
+parser.add_argument(
+  "--size-budgets",
+  type=str,
+  help="A JSON file of size budgets. Exit with an error if the generated types exceed any of them",
+)
+parser.add_argument(
+  "--shard",
+  type=parseShard,
+  help="Only validate the i-th of n partitions of the locales (e.g. 1/4) and write the partial problems next to the problems file",
+)
+parser.add_argument(
+  "--merge-shards",
+  action="store_true",
+  help="Merge the partial problems written by every --shard run instead of validating, then report as a single run",
+)
+parser.add_argument(
+  "--streaming",
+  action="store_true",
+  help="Validate one locale at a time, releasing it before loading the next one, so that only en stays in memory",
+)
+parser.add_argument(
+  "--locales",
+  help="Only validate these locales, separated by commas (e.g. fr,zh-CN). A change to en is validated across all locales",
+)
+parser.add_argument(
+  "--since",
+  metavar="GIT_REF",
+  help="Only validate the keys that changed since the git ref. Changes to en are validated across all locales",
 )
 
-# Wrapping up the script and printing out the results
-number_of_tag_problems = 0
-
-if problems:
-  message = "There are issues with the locales."
-
-  if args.print_problem_strings:
-    string_to_locales = {}
-    for locale, locale_problems in problems.items():
-      if "additional_variables" in locale_problems:
-        for problem_string in locale_problems["additional_variables"].keys():
-          if problem_string not in string_to_locales:
-            string_to_locales[problem_string] = [locale]
-          else:
-            string_to_locales[problem_string].append(locale)
-      if "missing_variables" in locale_problems:
-        for problem_string in locale_problems["missing_variables"].keys():
-          if problem_string not in string_to_locales:
-            string_to_locales[problem_string] = [locale]
-          else:
-            string_to_locales[problem_string].append(locale)
-      if "missing_br_tags" in locale_problems:
-        for problem_string, tag_issues in locale_problems["missing_br_tags"].items():
-          if tag_issues > 0:
-            if problem_string not in string_to_locales:
-              string_to_locales[problem_string] = [locale]
-            else:
-              string_to_locales[problem_string].append(locale)
-      if "missing_b_tags" in locale_problems:
-        for problem_string, tag_issues in locale_problems["missing_b_tags"].items():
-          if tag_issues > 0:
-            if problem_string not in string_to_locales:
-              string_to_locales[problem_string] = [locale]
-            else:
-              string_to_locales[problem_string].append(locale)
-      if "missing_span_tags" in locale_problems:
-        for problem_string, tag_issues in locale_problems["missing_span_tags"].items():
-          if tag_issues > 0:
-            if problem_string not in string_to_locales:
-              string_to_locales[problem_string] = [locale]
-            else:
-              string_to_locales[problem_string].append(locale)
-      if "disallowed_tags" in locale_problems:
-        for problem_string, tag_issues in locale_problems["disallowed_tags"].items():
-          if tag_issues > 0:
-            if problem_string not in string_to_locales:
-              string_to_locales[problem_string] = [locale]
-            else:
-              string_to_locales[problem_string].append(locale)
-      if "improper_tags" in locale_problems:
-        for problem_string, tag_issues in locale_problems["improper_tags"].items():
-          if tag_issues > 0:
-            if problem_string not in string_to_locales:
-              string_to_locales[problem_string] = [locale]
-            else:
-              string_to_locales[problem_string].append(locale)
-
-    console.debug(f"Problem strings: {json.dumps(string_to_locales, indent=2)}")
-    message += " See above for problem strings and which locales they are in."
-
-  if args.print_problem_formatting_tag_strings:
-    locales_to_strings = {}
-    for locale, locale_problems in problems.items():
-      locale_missing_br_tags = set()
-      locale_missing_b_tags = set()
-      locale_missing_span_tags = set()
-      locale_disallowed_tags = set()
-      locale_improper_tags = set()
-      if "missing_br_tags" in locale_problems:
-        for problem_string, tag_issues in locale_problems["missing_br_tags"].items():
-          if tag_issues > 0:
-            locale_missing_br_tags.add(problem_string)
-      if "missing_b_tags" in locale_problems:
-        for problem_string, tag_issues in locale_problems["missing_b_tags"].items():
-          if tag_issues > 0:
-            locale_missing_b_tags.add(problem_string)
-      if "missing_span_tags" in locale_problems:
-        for problem_string, tag_issues in locale_problems["missing_span_tags"].items():
-          if tag_issues > 0:
-            locale_missing_span_tags.add(problem_string)
-      if "disallowed_tags" in locale_problems:
-        for problem_string, tag_issues in locale_problems["disallowed_tags"].items():
-          if tag_issues > 0:
-            locale_disallowed_tags.add(problem_string)
-      if "improper_tags" in locale_problems:
-        for problem_string, tag_issues in locale_problems["improper_tags"].items():
-          if tag_issues > 0:
-            locale_improper_tags.add(problem_string)
-
-      locales_to_strings[locale] = {
-        "br": list(locale_missing_br_tags),
-        "b": list(locale_missing_b_tags),
-        "span": list(locale_missing_span_tags),
-        "disallowed_tags": list(locale_disallowed_tags),
-        "improper_tags": list(locale_improper_tags),
-      }
 
-      if locales_to_strings[locale]["br"] == []:
-        del locales_to_strings[locale]["br"]
-      if locales_to_strings[locale]["b"] == []:
-        del locales_to_strings[locale]["b"]
-      if locales_to_strings[locale]["span"] == []:
-        del locales_to_strings[locale]["span"]
-      if locales_to_strings[locale]["disallowed_tags"] == []:
-        del locales_to_strings[locale]["disallowed_tags"]
-      if locales_to_strings[locale]["improper_tags"] == []:
-        del locales_to_strings[locale]["improper_tags"]
-
-    console.info(f"Problem strings: {json.dumps(locales_to_strings, indent=2)}")
-    message += " See above for problem strings and which locales they are in."
-    for locale, locale_strings in locales_to_strings.items():
-      printed_locale = False
-      printed_problem_strings = set()
-      for tag_type, tag_strings in locale_strings.items():
-        if tag_strings:
+def validate_locales(validation_corpus, locale_names):
+  """
+  Validates the dynamic variables and formatting tags of the locales against en.
+
+  Args:
+    validation_corpus (LocaleCorpus): The corpus to validate.
+    locale_names (list): The locales to validate, including en.
+
+  Returns:
+    dict: The issues of each locale, see identifyLocaleDynamicVariableDifferences.
+  """
+  localeVariables = dict()
+  locale_b_tags = dict()
+  locale_br_tags = dict()
+  locale_span_tags = dict()
+  locale_disallowed_tags = dict()
+  locale_improper_tags = dict()
+  locale_signatures = dict()
+  # Extract the dynamic variables from each locale and store them in a dictionary
+  for locale in locale_names:
+    console.debug(f"Extracting dynamic variables for {locale}")
+    localeVariables[locale] = validation_corpus.variables(locale)
+    (
+      locale_b_tags[locale],
+      locale_br_tags[locale],
+      locale_span_tags[locale],
+      locale_disallowed_tags[locale],
+      locale_improper_tags[locale],
+    ) = validation_corpus.tags(locale)
+    locale_signatures[locale] = validation_corpus.signatureHashes(locale)
+
+  return identifyLocaleDynamicVariableDifferences(localeVariables, locale_b_tags,
+                                                  locale_br_tags,
+                                                  locale_span_tags, locale_disallowed_tags, locale_improper_tags,
+                                                  locale_signatures)
+
+
+def main():
+  args = parser.parse_args()
+
+  if args.debug:
+    console.enableDebug()
+
+  GENERATE_TYPES = args.generate_types
+  OUTPUT_DIR = "./ts/localization"
+  EN_FILE = args.en_file_path
+  INPUT_DIR = args.dict_dir
+
+  # Create a corpus that loads each locale file once and computes its derived facets on demand
+  corpus = LocaleCorpus(INPUT_DIR, args.dict_file_name, ["en"] if args.en_only else None)
+
+  # Generate the locales type and write it to a file
+  size_budgets_exceeded = []
+  if GENERATE_TYPES:
+    # The bytes removed by tree shaking are only reported by a full generation
+    record_sizes = args.size_report or args.size_budgets or (args.tree_shake and not args.incremental)
+    size_report = LocaleSizeReport() if record_sizes else None
+    kept_keys = None
+    if args.tree_shake:
+      kept_keys = select_tree_shaken_keys(
+        corpus.master.keys(), findReferencedKeys(corpus.master.keys()), load_keep_tokens(args.keep_tokens))
+    generateTypesOutputMessage = None
+    output_files = [OUTPUT_FILE]
+    if args.split_critical:
+      critical_entries = load_critical_entries(args.critical_entries)
+      critical_files = find_reachable_files(
+        critical_entries, None if args.critical_depth < 0 else args.critical_depth)
+      critical_keys = findReferencedKeys(corpus.master.keys(), critical_files)
+      console.debug(f"Critical files: {', '.join(critical_files)}")
+      # The import depth is a heuristic, a string of a component the entry files render must never be deferred
+      missing_critical_keys = {
+        token: locations for token, locations in find_component_call_sites(critical_entries).items()
+        if token in corpus.master and token not in critical_keys
+      }
+      if missing_critical_keys:
+        for token, locations in missing_critical_keys.items():
+          console.warn(f"{token} is used by a component rendered on startup ({', '.join(locations)})")
+        raise ValueError(f"{len(missing_critical_keys)} strings rendered on startup are not in the critical chunk, "
+                         f"raise --critical-depth or add the files that use them to {args.critical_entries}")
+      generateTypesOutputMessage = generateLocalesChunkedType(
+        corpus, critical_keys, kept_keys, size_report, 1 if args.disable_concurrency else None)
+      output_files = [OUTPUT_FILE, CRITICAL_OUTPUT_FILE, DEFERRED_OUTPUT_FILE]
+    elif args.incremental and size_report is None:
+      generateTypesOutputMessage = patchLocalesMergedType(corpus, kept_keys)
+    if generateTypesOutputMessage is None:
+      generateTypesOutputMessage = generateLocalesMergedType(
+        corpus, kept_keys, size_report, 1 if args.disable_concurrency else None)
+    console.info(generateTypesOutputMessage)
+
+    if args.tree_shake and size_report is not None:
+      removed_keys = [key for key in corpus.master if key not in kept_keys]
+      removed = size_report.removed(removed_keys)
+      console.info(f"Tree shaking removed {len(removed_keys)}/{len(corpus.master)} keys")
+      # A locale without its own translation of a key duplicates en, so only its translated keys are counted
+      console.info(f"{'Locale':<10} | {'Translations removed':>20} | {'Bytes removed':>13}")
+      for locale, (locale_removed_keys, locale_removed_bytes) in removed.items():
+        console.info(f"{locale:<10} | {locale_removed_keys:>20} | {locale_removed_bytes:>13}")
+      console.info(f"Tree shaking removed {sum(size for _, size in removed.values())} bytes of locale strings")
+      console.debug(f"Removed keys: {', '.join(removed_keys)}")
+
+    if size_report is not None:
+      size_summary = size_report.summary(kept_keys, sum(os.path.getsize(file) for file in output_files))
+      if args.size_report:
+        printSizeSummary(size_summary)
+        writeFile(args.size_report_file, dumpsJson(size_summary, indent=2))
+        console.info(f"Size report written to {args.size_report_file}")
+      if args.size_budgets:
+        size_budgets_exceeded = checkSizeBudgets(size_summary, loadSizeBudgets(args.size_budgets))
+        for exceeded in size_budgets_exceeded:
+          console.warn(exceeded)
+
+  if args.merge_shards:
+    # Merge the partial problems in the same locale order as a single run
+    problems_by_locale = dict()
+    old_variables_by_locale = dict()
+    for shard_file in findShardFiles(args.problems_file):
+      shard_result = loadJson(shard_file)
+      problems_by_locale.update(shard_result["problems"])
+      old_variables_by_locale.update(shard_result["old_dynamic_variables"])
+      console.debug(f"Merged {shard_file}")
+    problems = {locale: problems_by_locale[locale] for locale in corpus.localeNames() if locale in problems_by_locale}
+    found_old_dynamic_variables = identifyAndPrintOldDynamicVariables(
+      {locale: old_variables_by_locale[locale] for locale in corpus.localeNames() if locale in old_variables_by_locale},
+      args.print_old_dynamic_variables,
+    )
+    args.write_problems = True
+  else:
+    locale_names = corpus.localeNames()
+    validation_corpus = corpus
+    if args.since:
+      changed_keys_by_locale = changedLocaleKeys(args.since, corpus)
+      changed_keys = set().union(*changed_keys_by_locale.values())
+      if "en" not in changed_keys_by_locale:
+        locale_names = ["en"] + [locale for locale in locale_names if locale in changed_keys_by_locale]
+      validation_corpus = corpus.subset(changed_keys)
+      console.info(
+        f"Validating {len(changed_keys)} keys changed since {args.since} in {len(locale_names) - 1} locales")
+
+    if args.locales:
+      selected_locales = {locale.strip().replace("-", "_") for locale in args.locales.split(",")}
+      if "en" not in selected_locales:
+        locale_names = ["en"] + [locale for locale in locale_names if locale in selected_locales]
+        console.info(f"Validating {len(locale_names) - 1} locales: {', '.join(locale_names[1:])}")
+
+    if args.shard:
+      # en is always loaded as every locale is validated against it
+      locale_names = ["en"] + [locale for locale in locale_names if
+                               locale in selectShard([name for name in locale_names if name != "en"], args.shard)]
+      console.info(f"Validating shard {args.shard[0]}/{args.shard[1]}: {len(locale_names) - 1} locales")
+
+    if args.streaming:
+      # Only en and its facets stay loaded: every other locale is loaded, validated against en and released before the
+      # next one, so the memory use does not grow with the number of locales
+      problems = dict()
+      old_variables = dict()
+      found_old_dynamic_variables = False
+      for locale in locale_names:
+        if locale != "en":
+          problems.update(validate_locales(validation_corpus, ["en", locale]))
+        old_variables[locale] = validation_corpus.oldVariables(locale)
+        found_old_dynamic_variables = identifyAndPrintOldDynamicVariables(
+          {locale: old_variables[locale]}, args.print_old_dynamic_variables
+        ) or found_old_dynamic_variables
+        if locale != "en":
+          validation_corpus.release(locale)
+    else:
+      problems = validate_locales(validation_corpus, locale_names)
+      old_variables = {locale: validation_corpus.oldVariables(locale) for locale in locale_names}
+      found_old_dynamic_variables = identifyAndPrintOldDynamicVariables(old_variables, args.print_old_dynamic_variables)
+
+    if args.shard:
+      shard_file = shardFilePath(args.problems_file, args.shard)
+      writeFile(shard_file, dumpsJson({
+        "locales": locale_names,
+        "problems": problems,
+        # Only the keys with old dynamic variables, which the merge prints like a single run
+        "old_dynamic_variables": {
+          locale: {key: value for key, value in locale_old_variables.items() if value}
+          for locale, locale_old_variables in old_variables.items()
+        },
+      }, indent=2))
+      console.info(f"Shard problems written to {shard_file}")
+
+  # Wrapping up the script and printing out the results
+  number_of_tag_problems = 0
+
+  # Every report below is a projection of the index of the findings
+  issue_index = IssueIndex.fromProblems(problems)
+
+  if problems:
+    message = "There are issues with the locales."
+
+    if args.print_problem_strings:
+      string_to_locales = issue_index.stringsToLocales()
+      console.debug(f"Problem strings: {dumpsJson(string_to_locales, indent=2)}")
+      message += " See above for problem strings and which locales they are in."
+
+    if args.print_problem_formatting_tag_strings:
+      locales_to_strings = issue_index.localesToTagStrings()
+      console.info(f"Problem strings: {dumpsJson(locales_to_strings, indent=2)}")
+      message += " See above for problem strings and which locales they are in."
+      for locale, locale_strings in locales_to_strings.items():
+        printed_locale = False
+        printed_problem_strings = set()
+        for tag_type, tag_strings in locale_strings.items():
           if locale in ignored_strings_formatting and tag_strings == ignored_strings_formatting[locale]:
             continue
           if not printed_locale:
@@ -273,80 +418,80 @@ if problems:
             if tag_string not in printed_problem_strings:
               printed_problem_strings.add(tag_string)
               number_of_tag_problems += 1
-              print(
-                f"- [{tag_string}](https://crowdin.com/editor/session-crossplatform-strings/300/en-{locale.replace('-','').replace('_','').lower()}?view=comfortable&filter=basic&value=3#q={tag_string})")
-    print(f"Total Problems: {number_of_tag_problems}")
+              print(f"- [{tag_string}]({crowdinLink(tag_string, locale)})")
+      print(f"Total Problems: {number_of_tag_problems}")
 
-  if args.print_problems:
-    prettyPrintIssuesTable(problems)
-    message += " See above for details."
+    if args.print_problems:
+      prettyPrintIssuesTable(issue_index)
+      message += " See above for details."
 
-  if args.write_problems:
-    writeFile(args.problems_file, json.dumps(problems, indent=2))
-    console.info(f"Problems written to {args.problems_file}")
-    message += f" Problems written to {args.problems_file}"
+    if args.write_problems:
+      writeFile(args.problems_file, dumpsJson(problems, indent=2))
+      console.info(f"Problems written to {args.problems_file}")
+      message += f" Problems written to {args.problems_file}"
 
-  if not args.print_problems and not args.write_problems:
-    message += " Run the script with --print-problems or --write-problems to see the problems."
+    if not args.print_problems and not args.write_problems:
+      message += " Run the script with --print-problems or --write-problems to see the problems."
 
-  console.warn(message)
+    console.warn(message)
 
-if found_old_dynamic_variables:
-  warning_message = (
-    "Old dynamic variables were found in the locales. Please update the locales to use the new dynamic variables. "
-  )
-  if args.print_old_dynamic_variables:
-    if args.print_problems:
-      warning_message += "See above for details (before the problems table)."
+  if found_old_dynamic_variables:
+    warning_message = (
+      "Old dynamic variables were found in the locales. Please update the locales to use the new dynamic variables. "
+    )
+    if args.print_old_dynamic_variables:
+      if args.print_problems:
+        warning_message += "See above for details (before the problems table)."
+      else:
+        warning_message += "See above for details."
     else:
-      warning_message += "See above for details."
-  else:
-    warning_message += "Run the script with --print-old-dynamic-variables to see the old dynamic variables."
-  console.warn(warning_message)
+      warning_message += "Run the script with --print-old-dynamic-variables to see the old dynamic variables."
+    console.warn(warning_message)
 
-console.debug("Locales generation complete")
+  console.debug("Locales generation complete")
 
-timer.stop()
+  timer.stop()
 
-if args.error_on_problems:
-  missing_keys_all = 0
-  additional_keys_all = 0
-  missing_variables_all = 0
-  additional_variables_all = 0
+  if args.error_on_problems:
+    totals = issue_index.totals()
+    missing_keys_all = totals["missing_keys"]
+    additional_keys_all = totals["additional_keys"]
+    missing_variables_all = totals["missing_variables"]
+    additional_variables_all = totals["additional_variables"]
 
-  for locale_name, locale_issues in problems.items():
-    if locale_name == "en":
-      continue
+    EXIT_CODE = 0
 
-    missing_keys_all += len(locale_issues.get("missing_keys", []))
-    additional_keys_all += len(locale_issues.get("additional_keys", []))
-    missing_variables_all += sum(
-      len(v) for v in locale_issues.get("missing_variables", {}).values()
-    )
-    additional_variables_all += sum(
-      len(v) for v in locale_issues.get("additional_variables", {}).values()
-    )
+    if missing_keys_all > 0:
+      console.log(f"Missing keys: {missing_keys_all}")
+
+    if additional_keys_all > 0:
+      console.log(f"Additional keys: {additional_keys_all}")
+
+    if missing_variables_all > 0:
+      console.log(f"Missing variables: {missing_variables_all}")
+      EXIT_CODE = 1
 
-  EXIT_CODE = 0
+    if additional_variables_all > 0:
+      console.log(f"Additional variables: {additional_variables_all}")
+      EXIT_CODE = 1
 
-  if missing_keys_all > 0:
-    console.log(f"Missing keys: {missing_keys_all}")
+    if number_of_tag_problems > 0:
+      console.log(f"Formatting issues: {number_of_tag_problems}")
+      EXIT_CODE = 1
 
-  if additional_keys_all > 0:
-    console.log(f"Additional keys: {additional_keys_all}")
+    if size_budgets_exceeded:
+      console.log(f"Size budgets exceeded: {len(size_budgets_exceeded)}")
+      EXIT_CODE = 1
 
-  if missing_variables_all > 0:
-    console.log(f"Missing variables: {missing_variables_all}")
-    EXIT_CODE = 1
+    sys.exit(EXIT_CODE)
 
-  if additional_variables_all > 0:
-    console.log(f"Additional variables: {additional_variables_all}")
-    EXIT_CODE = 1
+  if size_budgets_exceeded:
+    console.log(f"Size budgets exceeded: {len(size_budgets_exceeded)}")
+    sys.exit(1)
 
-  if number_of_tag_problems > 0:
-    console.log(f"Formatting issues: {number_of_tag_problems}")
-    EXIT_CODE = 1
+  sys.exit(0)
 
-  sys.exit(EXIT_CODE)
 
-sys.exit(0)
+# The types are rendered on a process pool, whose workers import this module again when they are spawned
+if __name__ == "__main__":
+  main()
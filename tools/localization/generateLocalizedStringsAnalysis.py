@@ -3,10 +3,9 @@ import os
 import sys
 import csv
 import re
-import glob
 import argparse
 import multiprocessing
-import json
+import threading
 from functools import partial
 
 # This allows for importing from the localization and util directories NOTE: Auto importing tools will also prepend the import paths with "tools." this will not work and needs to be removed from import paths
@@ -17,8 +16,18 @@ import time
 
 timer = ExecutionTimer()
 
-from localization.regex import localization_regex_as_list
-from util.fileUtils import makeDirIfNotExists, removeFileIfExists
+from localization.localeCorpus import LocaleCorpus
+from localization.regex import RegexStats
+from localization.sourceUsage import (
+  files_to_ignore,
+  find_source_files,
+  extract_call_site_tokens,
+  SourceFilePipeline,
+  DEFAULT_READ_WORKERS,
+)
+from util.fileUtils import makeDirIfNotExists, removeFileIfExists, writeFile
+from util.jsonUtils import dumpsJson, loadJson
+from util.shardUtils import parseShard, selectShard, shardFilePath, findShardFiles
 from util.logger import console
 
 parser = argparse.ArgumentParser()
@@ -41,6 +50,11 @@ parser.add_argument(
   action="store_true",
   help="Write the not found strings to a file",
 )
+parser.add_argument(
+  "--write-not-in-master-list-to-file",
+  action="store_true",
+  help="Write the tokens used in the code but missing from the en locale to a file",
+)
 parser.add_argument(
   "--print-not-found",
   action="store_true",
@@ -71,9 +85,45 @@ parser.add_argument(
   action="store_true",
   help="Delete unused keys."
 )
+parser.add_argument(
+  "--memory-budget-mb",
+  type=int,
+  default=256,
+  help="The maximum size of the source files held in memory at once, in MB.",
+)
+parser.add_argument(
+  "--read-workers",
+  type=int,
+  default=DEFAULT_READ_WORKERS,
+  help="The number of threads loading source files while they are searched.",
+)
+parser.add_argument(
+  "--regex-stats-file",
+  type=str,
+  default="./tools/localization/output/regex_stats.json",
+  help="The file the per-pattern regex statistics are loaded from and saved to. The patterns are tried in order of measured hits per second.",
+)
+parser.add_argument(
+  "--print-regex-stats",
+  action="store_true",
+  help="Print the per-pattern regex statistics.",
+)
+parser.add_argument(
+  "--shard",
+  type=parseShard,
+  help="Only search for the i-th of n partitions of the keys (e.g. 1/4) and write a partial result to the output directory",
+)
+parser.add_argument(
+  "--merge-shards",
+  action="store_true",
+  help="Merge the partial results written by every --shard run into the result files instead of searching",
+)
 
 args = parser.parse_args()
 
+if args.shard and args.delete_unused_keys:
+  parser.error("--delete-unused-keys can only be used with a full run or --merge-shards")
+
 # Configuration
 DEBUG = args.debug
 CONCURRENCY_ENABLED = not args.disable_concurrency
@@ -87,13 +137,21 @@ if CONCURRENCY_ENABLED:
 
 console.enableDebug() if DEBUG else None
 
+if args.shard and (args.write_found_to_file or args.write_not_found_to_file or args.write_not_in_master_list_to_file):
+  # Each shard only knows about its own keys, the result files are written by --merge-shards
+  args.write_found_to_file = False
+  args.write_not_found_to_file = False
+  args.write_not_in_master_list_to_file = False
+  console.info(f"Result files are written by --merge-shards when --shard is used")
+
 OUTPUT_DIR = args.output_dir
 FOUND_STRINGS_PATH = os.path.join(OUTPUT_DIR, "found_strings.csv")
 NOT_FOUND_STRINGS_PATH = os.path.join(OUTPUT_DIR, "not_found_strings.txt")
 POTENTIAL_MATCHES_PATH = os.path.join(OUTPUT_DIR, "potential_matches.csv")
 NOT_IN_MASTER_LIST_PATH = os.path.join(OUTPUT_DIR, "not_in_master_list.csv")
+SHARD_RESULT_PATH = os.path.join(OUTPUT_DIR, "analysis.json")
 
-EN_PATH = "_locales/en/messages.json"
+LOCALES_DIR = "./_locales"
 
 # Remove files that are to be generated if they exist
 removeFileIfExists(FOUND_STRINGS_PATH)
@@ -108,34 +166,10 @@ def flush():
 
 # File search setup
 console.info("Scanning for localized strings...")
-files_to_ignore = ["./ts/localization/locales.ts"]
-ignore_patterns = [re.compile(re.escape(pattern)) for pattern in files_to_ignore]
-
 console.debug(f"Ignoring files: {', '.join(files_to_ignore)}")
 
-
-def should_ignore_file(path):
-  return any(pattern.search(path) for pattern in ignore_patterns)
-
-
-def find_files_with_extension(root_dir, extensions):
-  for entry in os.scandir(root_dir):
-    if entry.is_dir():
-      yield from find_files_with_extension(entry.path, extensions)
-    elif any(entry.name.endswith(ext) for ext in extensions) and not should_ignore_file(entry.path):
-      yield entry.path
-
-
 os_walk_time_start = time.perf_counter()
-files = set(find_files_with_extension("./ts/", (".ts", ".tsx")))
-files.update(
-  [
-    y
-    for x in os.listdir("./")
-    for y in glob.glob(os.path.join(x[0], "*preload.js"))
-    if not should_ignore_file(y)
-  ]
-)
+files = find_source_files() if not args.merge_shards else set()
 os_walk_time_end = time.perf_counter()
 
 bar_length = 50
@@ -162,47 +196,88 @@ def progress_bar(current, total):
   sys.stdout.flush()
 
 
-# Read json file and get all keys
+# Load the en locale and get all keys
 parse_locale_file_time_start = time.perf_counter()
-with open(EN_PATH, 'r', encoding='utf-8') as messages_file:
-  key_list = json.load(messages_file).keys()
+corpus = LocaleCorpus(LOCALES_DIR)
+key_list = corpus.master.keys()
+if args.shard:
+  shard_keys = selectShard(key_list, args.shard)
+  key_list = [key for key in key_list if key in shard_keys]
+  console.info(f"Searching shard {args.shard[0]}/{args.shard[1]}")
 number_of_keys = len(key_list)
 console.info(f"Loaded {number_of_keys} keys to search for")
 parse_locale_file_time_end = time.perf_counter()
 
 
-def search_string_in_regex_list(regex_list, file_content):
-  return any(matcher.search(file_content) for matcher in regex_list)
+regex_stats = RegexStats.load(args.regex_stats_file)
+
+MEMORY_BUDGET = args.memory_budget_mb * 1024 * 1024
+
+# Every token literal used at an i18n call site is extracted while the files are scanned, so tokens that are missing
+# from the en locale are caught without searching for them
+master_keys = set(corpus.master)
+not_in_master_list = dict()
 
 
-def load_file(file_path):
-  console.debug(f"Loading {file_path} into memory")
-  return open(file_path, "r", encoding="utf-8").read()
+def collect_call_site_tokens(file_path, file_content):
+  for token, locations in extract_call_site_tokens(file_path, file_content).items():
+    if token not in master_keys:
+      not_in_master_list.setdefault(token, []).extend(locations)
 
 
-read_files_time_start = time.perf_counter()
-loaded_files = [load_file(file_path) for file_path in files]
-read_files_time_end = time.perf_counter()
+# The compiled regex list of each key, compiled once per process
+compiled_regex_lists = dict()
 
 
-def find_key(key):
-  regex_list = localization_regex_as_list(key)
-  return key if any(search_string_in_regex_list(regex_list, file_content) for file_content in loaded_files) else None
+def find_keys_in_file(task):
+  index, file_content, keys = task
+  # Each worker records into its own statistics which are merged by the main process
+  file_stats = RegexStats()
+  file_stats.order = regex_stats.order
+  found = []
+  for key in keys:
+    if key not in compiled_regex_lists:
+      compiled_regex_lists[key] = file_stats.compile(key)
+    if file_stats.search(compiled_regex_lists[key], file_content):
+      found.append(key)
+  return index, found, file_stats.patterns
 
 
 def process_keys_concurrently():
+  # The files are loaded on a thread pool and handed to the process pool as they arrive. Each file is only searched for
+  # the keys that were not found yet when it was handed over.
+  remaining_keys = set(key_list)
+  remaining_keys_lock = threading.Lock()
+  pipeline = SourceFilePipeline(files, MEMORY_BUDGET, args.read_workers, auto_release=False)
+
+  def tasks():
+    for index, file_path, file_content in pipeline:
+      collect_call_site_tokens(file_path, file_content)
+      with remaining_keys_lock:
+        keys = [key for key in key_list if key in remaining_keys]
+      yield index, file_content, keys
+
   with multiprocessing.Pool() as pool:
-    result = pool.map(find_key, key_list)
-    return set(result)
+    for processed, (index, found, file_stats) in enumerate(pool.imap_unordered(find_keys_in_file, tasks()), start=1):
+      pipeline.release(index)
+      regex_stats.merge(file_stats)
+      with remaining_keys_lock:
+        remaining_keys.difference_update(found)
+      progress_bar(processed, len(files))
+  return set(key_list).difference(remaining_keys)
 
 
 REGEX_TIME_TRACKER = 0.0
+# The line numbers are found by searching every line of a file again. These searches of short contents would skew the
+# order of the patterns and the fit of their cost against the file size, so they are recorded separately and discarded.
+line_number_stats = RegexStats()
+line_number_stats.order = regex_stats.order
 
 
-def regex_find(regex_list, file_content):
+def regex_find(regex_list, file_content, stats=regex_stats):
   global REGEX_TIME_TRACKER  # Declare the variable as global
   regex_start = time.perf_counter()
-  found = search_string_in_regex_list(regex_list, file_content)
+  found = stats.search(regex_list, file_content)
   regex_end = time.perf_counter()
   REGEX_TIME_TRACKER += (regex_end - regex_start)  # Correct time calculation
   return found
@@ -221,29 +296,30 @@ def process_keys():
     for_loop_iterations["keys"] = 0
     for_loop_iterations["files"] = 0
     for_loop_iterations["lines"] = 0
-  i = -1
-  for key in key_list:
-    i = i + 1
-    regex_list = localization_regex_as_list(key)
+  regex_lists = {key: regex_stats.compile(key) for key in key_list}
+  # The locations of each key as (file index, location), files are scanned in the order they finish loading
+  indexed_locations = {key: [] for key in key_list}
 
+  processed = 0
+  for j, file_path, file_content in SourceFilePipeline(files, MEMORY_BUDGET, args.read_workers):
+    processed += 1
     progress_bar(
-      i, number_of_keys
+      processed, len(files)
     )
 
     if DEBUG:
-      for_loop_iterations["keys"] += 1
-
-    print_search(key, f"Searching")
+      for_loop_iterations["files"] += 1
 
-    locations = []
-    j = -1
-    for file_path in files:
-      j += 1
+    collect_call_site_tokens(file_path, file_content)
 
+    # Once a key is found it only needs to be searched for again to find all of its line numbers
+    keys = key_list if args.identify_line_numbers else [key for key in key_list if key not in found_strings_set]
+    lines = None
+    for key in keys:
       if DEBUG:
-        for_loop_iterations["files"] += 1
+        for_loop_iterations["keys"] += 1
 
-      if not regex_find(regex_list, loaded_files[j]):
+      if not regex_find(regex_lists[key], file_content):
         continue
 
       found_strings_set.add(key)
@@ -251,19 +327,22 @@ def process_keys():
       print_search(key, f"Found string in {file_path}")
 
       if args.identify_line_numbers:
-        for line_number, line in enumerate(loaded_files[j].split("\n"), start=1):
+        if lines is None:
+          lines = file_content.split("\n")
+        for line_number, line in enumerate(lines, start=1):
           if DEBUG:
             for_loop_iterations["lines"] += 1
 
-          if regex_find(regex_list, line):
-            locations.append(f"./{file_path}:{line_number}")
+          if regex_find(regex_lists[key], line, line_number_stats):
+            indexed_locations[key].append((j, f"./{file_path}:{line_number}"))
 
+  for key in key_list:
     if key not in found_strings_set:
       not_found_strings_set.add(key)
       print_search(key, f"Not Found")
-    if locations:
-      print_search(key, f"Found in {len(locations)} files")
-      found_strings_and_locations[key] = locations
+    if indexed_locations[key]:
+      print_search(key, f"Found in {len(indexed_locations[key])} files")
+      found_strings_and_locations[key] = [location for _, location in sorted(indexed_locations[key])]
 
   if DEBUG:
     console.debug(for_loop_iterations)
@@ -272,7 +351,33 @@ def process_keys():
 
 found_strings_and_locations = None
 processing_time_start = time.perf_counter()
-if CONCURRENCY_ENABLED:
+if args.merge_shards:
+  # Merge the partial results in the same key order as a single run
+  found_keys = set()
+  shard_locations = dict()
+  files = []
+  for shard_file in findShardFiles(SHARD_RESULT_PATH):
+    shard_result = loadJson(shard_file)
+    found_keys.update(shard_result["found"])
+    for token, locations in shard_result["not_in_master_list"].items():
+      not_in_master_list.setdefault(token, locations)
+    # Every shard searches the same files, the potential matches are searched in them again
+    files = shard_result["files"]
+    if shard_result["locations"] is None:
+      shard_locations = None
+    elif shard_locations is not None:
+      shard_locations.update(shard_result["locations"])
+    console.debug(f"Merged {shard_file}")
+  not_found_keys = [key for key in key_list if key not in found_keys]
+  if shard_locations is not None:
+    found_strings_and_locations = {key: shard_locations[key] for key in key_list if key in shard_locations}
+  if shard_locations is None:
+    console.warn("Some shards did not record the locations of the found strings, so they are not written. Run every "
+                 "shard with --disable-concurrency or --identify-line-numbers to write them.")
+  args.write_found_to_file = True
+  args.write_not_found_to_file = True
+  args.write_not_in_master_list_to_file = True
+elif CONCURRENCY_ENABLED:
   results_set = process_keys_concurrently()
   found_keys = set(key_list).intersection(results_set)
   not_found_keys = set(key_list).difference(results_set)
@@ -283,6 +388,21 @@ processing_time_end = time.perf_counter()
 progress_bar(1, 1)
 flush()
 
+if not args.merge_shards:
+  regex_stats.save(args.regex_stats_file)
+  for template in regex_stats.superlinear_patterns():
+    console.warn(f"Regex cost grows superlinearly with the file size: {template}")
+
+if args.shard:
+  shard_file = shardFilePath(SHARD_RESULT_PATH, args.shard)
+  writeFile(shard_file, dumpsJson({
+    "found": [key for key in key_list if key in found_keys],
+    "files": list(files),
+    "locations": found_strings_and_locations,
+    "not_in_master_list": not_in_master_list,
+  }, indent=2))
+  console.info(f"Shard result written to {shard_file}")
+
 # Writing found strings and their locations to a CSV file
 if args.write_found_to_file and found_strings_and_locations is not None:
   makeDirIfNotExists(FOUND_STRINGS_PATH)
@@ -302,6 +422,15 @@ if args.write_not_found_to_file:
     for notFound in not_found_keys:
       not_found_file.write(f"{notFound}\n")
 
+# Writing the tokens used in the code but missing from the en locale and their locations to a CSV file
+if args.write_not_in_master_list_to_file:
+  makeDirIfNotExists(NOT_IN_MASTER_LIST_PATH)
+  with open(NOT_IN_MASTER_LIST_PATH, "w", encoding="utf-8", newline="") as csvfile:
+    csvwriter = csv.writer(csvfile)
+    csvwriter.writerow(["String", "Locations"])  # Header row
+    for token in sorted(not_in_master_list):
+      csvwriter.writerow([token, "; ".join(not_in_master_list[token])])
+
 num_found = len(found_keys)
 num_not_found = len(not_found_keys)
 
@@ -312,26 +441,20 @@ if args.print_not_found:
   [print(key) for key in sorted(not_found_keys)]
 
 
-def find_key_lazy(key):
-  i = -1
-  regex = re.compile(fr"['\"]{re.escape(key)}['\"]")
-  for file_path in files:
-    i += 1
-    if regex.search(loaded_files[i]):
-      return key, file_path
-  return None, None
-
-
 def find_lazy_matches_for_not_found():
-  with multiprocessing.Pool() as pool:
-    result = pool.map(find_key_lazy, not_found_keys)
-    return set(result)
+  regexes = {key: re.compile(fr"['\"]{re.escape(key)}['\"]") for key in not_found_keys}
+  # The first file (in path order) matching each key, files are scanned in the order they finish loading
+  first_matches = dict()
+  for index, _, file_content in SourceFilePipeline(files, MEMORY_BUDGET, args.read_workers):
+    for key, regex in regexes.items():
+      if (key not in first_matches or index < first_matches[key]) and regex.search(file_content):
+        first_matches[key] = index
+  return {(key, files[index]) for key, index in first_matches.items()}
 
 
 potential_matches = set()
 if args.find_potential_matches:
   potential_matches = find_lazy_matches_for_not_found()
-  potential_matches.discard((None, None))
   [console.info(f"{key:<{42}} | Potential Match: {file_name}") for key, file_name in potential_matches]
   console.info(f"Found {len(potential_matches)} potential matches")
 
@@ -342,7 +465,7 @@ if args.find_potential_matches and len(potential_matches) > 0:
   console.info(
     f"(Including all potential matches) Found {num_found + len(potential_matches)}/{number_of_keys} ({((num_found + len(potential_matches)) / number_of_keys):.0%}) strings in {len(files)} files")
 
-if args.write_found_to_file:
+if args.write_found_to_file and found_strings_and_locations is not None:
   console.info(f"Found strings and their locations written to: {FOUND_STRINGS_PATH}")
 
 if args.write_not_found_to_file:
@@ -352,39 +475,46 @@ if args.write_not_found_to_file:
 else:
   console.info(f"Identified {num_not_found} not found strings")
 
+if args.write_not_in_master_list_to_file:
+  console.info(
+    f"Identified {len(not_in_master_list)} tokens not in the master list and written to: {NOT_IN_MASTER_LIST_PATH}"
+  )
+elif not_in_master_list:
+  console.warn(
+    f"Identified {len(not_in_master_list)} tokens not in the master list. Use --write-not-in-master-list-to-file to see them")
+
+if args.print_regex_stats:
+  regex_stats.print_table()
+
 if DEBUG and REGEX_TIME_TRACKER > 0:
   console.debug(f"Time spend in regex land: {REGEX_TIME_TRACKER:0.4f} seconds")
 
 if DEBUG:
   os_walk_time = os_walk_time_end - os_walk_time_start
   parse_locale_time = parse_locale_file_time_end - parse_locale_file_time_start
-  read_files_time = read_files_time_end - read_files_time_start
   processing_time = processing_time_end - processing_time_start
   console.debug(f"OS Walk reading time: {os_walk_time:0.4f} seconds")
   console.debug(f"Locale File parse time: {parse_locale_time:0.4f} seconds")
-  console.debug(f"File reading time: {read_files_time:0.4f} seconds")
+  # Source files are read and their tokens extracted while they are searched, so this is included in the processing time
   console.debug(f"Processing time: {processing_time:0.4f} seconds")
   console.debug(
-    f"Total Elapsed Tracked Time: {os_walk_time + parse_locale_time + read_files_time + processing_time:0.4f} seconds")
+    f"Total Elapsed Tracked Time: {os_walk_time + parse_locale_time + processing_time:0.4f} seconds")
 
 timer.stop()
 
 
 def remove_keys_from_json(json_file_path, keys_to_remove):
   # Load the JSON data from the file
-  with open(json_file_path, 'r', encoding='utf-8') as json_file:
-    data = json.load(json_file)
+  data = loadJson(json_file_path)
 
   # Remove the specified keys from the JSON data
   data = {key: value for key, value in data.items() if key not in keys_to_remove}
 
   # Write the updated data back to the original JSON file
-  with open(json_file_path, 'w', encoding='utf-8') as json_file:
-    json.dump(data, json_file, ensure_ascii=False, indent=4)
+  writeFile(json_file_path, dumpsJson(data, indent=4, ensureAscii=False))
   print(f"Keys removed and JSON file updated: {json_file_path}")
 
 
 if args.delete_unused_keys:
-  locale_files = find_files_with_extension("./_locales", "message.json")
-  for locale_file in locale_files:
+  for locale_file in corpus.localeFiles.values():
     remove_keys_from_json(locale_file, not_found_keys)
@@ -0,0 +1,132 @@
+#!/bin/python3
+import argparse
+import os
+import re
+import subprocess
+import sys
+import zipfile
+
+# This allows for importing from the localization and util directories NOTE: Auto importing tools will also prepend the import paths with "tools." this will not work and needs to be removed from import paths
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from util.time import ExecutionTimer
+
+timer = ExecutionTimer()
+
+from util.fileUtils import writeFileAtomically
+from util.jsonUtils import loadsJson
+from util.logger import console
+from util.sortJson import formatJson
+
+GENERATE_LOCALES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "generateLocales.py")
+# The locale directories are named after the locale, e.g. fr, es-419 or zh-CN
+LOCALE_DIR_PATTERN = re.compile(r"^[A-Za-z]{2,3}(?:[-_][A-Za-z0-9]+)*$")
+# The trailing whitespace of a new locale file, the existing ones keep theirs
+NEW_FILE_TRAILING = "\n\n"
+
+parser = argparse.ArgumentParser(
+  description="Import a translation export into the locales. Only the locale files whose content changed are written, "
+              "then only the changed locales are validated and the types are patched incrementally. Any other "
+              "argument is passed on to generateLocales.py (e.g. --print-problems --error-on-problems)."
+)
+parser.add_argument(
+  "export",
+  help="The zip archive or directory of the export, with a <locale>/messages.json file for each locale at any depth",
+)
+parser.add_argument("--dict-dir", type=str, default="./_locales")
+parser.add_argument("--dict-file-name", type=str, default="messages.json")
+parser.add_argument("--dry-run", action="store_true", help="Only report the locales that would change")
+parser.add_argument(
+  "--skip-generate",
+  action="store_true",
+  help="Only import the locale files, without validating them or generating the types",
+)
+parser.add_argument("--debug", action="store_true", help="Enable debug mode")
+
+args, generate_args = parser.parse_known_args()
+
+if args.debug:
+  console.enableDebug()
+
+
+def export_entries(export_path, file_name):
+  """
+  Iterates over the locale files of an export, reading a single file at a time.
+
+  Args:
+    export_path (str): The zip archive or directory of the export.
+    file_name (str): The name of the locale files.
+
+  Returns:
+    generator: (locale directory name, file content) tuples.
+  """
+  if os.path.isdir(export_path):
+    for root, dirs, files in os.walk(export_path):
+      dirs.sort()
+      if file_name in files and os.path.abspath(root) != os.path.abspath(export_path):
+        with open(os.path.join(root, file_name), "rb") as file:
+          yield os.path.basename(root), file.read()
+  else:
+    with zipfile.ZipFile(export_path) as archive:
+      for entry in archive.infolist():
+        parts = entry.filename.split("/")
+        if entry.is_dir() or len(parts) < 2 or parts[-1] != file_name:
+          continue
+        yield parts[-2], archive.read(entry)
+
+
+changed_locales = []
+added_locales = []
+number_of_unchanged = 0
+for locale_dir, content in export_entries(args.export, args.dict_file_name):
+  if not LOCALE_DIR_PATTERN.match(locale_dir):
+    console.warn(f"Skipping {locale_dir}/{args.dict_file_name} of the export, {locale_dir} is not a locale")
+    continue
+  try:
+    data = loadsJson(content)
+  except ValueError as error:
+    raise ValueError(f"{locale_dir}/{args.dict_file_name} of the export is not valid JSON: {error}") from error
+
+  file_path = os.path.join(args.dict_dir, locale_dir, args.dict_file_name)
+  trailing = NEW_FILE_TRAILING
+  if os.path.exists(file_path):
+    with open(file_path, "r", encoding="utf-8") as f:
+      raw = f.read()
+    # The content is compared rather than the bytes, so a different formatting or key order is not a change
+    if loadsJson(raw) == data:
+      console.debug(f"{file_path} is unchanged")
+      number_of_unchanged += 1
+      continue
+    trailing = raw[len(raw.rstrip()):]
+  else:
+    added_locales.append(locale_dir)
+
+  changed_locales.append(locale_dir)
+  if args.dry_run:
+    console.info(f"{file_path} would be updated")
+    continue
+  writeFileAtomically(file_path, formatJson(data, trailing))
+  console.info(f"{file_path} updated")
+
+console.info(
+  f"{len(changed_locales)} locales changed ({len(added_locales)} added), {number_of_unchanged} unchanged"
+  + (f": {', '.join(changed_locales)}" if changed_locales else ""))
+timer.stop()
+
+if changed_locales and not args.dry_run and not args.skip_generate:
+  command = [
+    sys.executable,
+    GENERATE_LOCALES_FILE,
+    "--dict-dir",
+    args.dict_dir,
+    "--dict-file-name",
+    args.dict_file_name,
+    "--locales",
+    ",".join(changed_locales),
+    "--generate-types",
+    # The types of a new locale cannot be patched into the previous generation, they are fully generated instead
+    *([] if added_locales else ["--incremental"]),
+    *generate_args,
+  ]
+  console.info(f"Validating the changed locales: {' '.join(command[1:])}")
+  sys.exit(subprocess.run(command).returncode)
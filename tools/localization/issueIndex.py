@@ -0,0 +1,161 @@
+import os
+import sys
+
+# This allows for importing from the localization and util directories NOTE: Auto importing tools will also prepend the import paths with "tools." this will not work and needs to be removed from import paths
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from localization.localeCorpus import MASTER_LOCALE
+
+# The issue types found by identifyLocaleDynamicVariableDifferences. The keys are lists of keys, the variables map each
+# key to a list of variables and the tags map each key to the difference in the number of tags.
+KEY_ISSUE_TYPES = ("missing_keys", "additional_keys")
+VARIABLE_ISSUE_TYPES = ("missing_variables", "additional_variables")
+TAG_ISSUE_TYPES = ("missing_b_tags", "missing_br_tags", "missing_span_tags", "disallowed_tags", "improper_tags")
+ISSUE_TYPES = KEY_ISSUE_TYPES + VARIABLE_ISSUE_TYPES + TAG_ISSUE_TYPES
+
+# The short names of the tag issue types used by the formatting tag report
+TAG_ISSUE_NAMES = {
+  "missing_br_tags": "br",
+  "missing_b_tags": "b",
+  "missing_span_tags": "span",
+  "disallowed_tags": "disallowed_tags",
+  "improper_tags": "improper_tags",
+}
+
+CROWDIN_EDITOR_URL = "https://crowdin.com/editor/session-crossplatform-strings/300"
+
+
+def crowdinLink(key, locale):
+  return f"{CROWDIN_EDITOR_URL}/en-{locale.replace('-', '').replace('_', '').lower()}?view=comfortable&filter=basic&value=3#q={key}"
+
+
+class IssueIndex:
+  """
+  An inverted index of the validation findings, keyed by key, then locale, then issue type. Every report is a
+  projection of it, so the cost of reporting follows the number of findings rather than the number of reports.
+
+  The value of a finding is True for a missing or additional key, the list of variables for a variable issue, and the
+  difference in the number of tags for a tag issue. A tag finding is a problem when it is positive: the locale has
+  fewer tags than en, or has disallowed or improper tags.
+  """
+
+  def __init__(self):
+    # key -> locale -> issue type -> value
+    self.findings = dict()
+    # locale -> issue type -> number of problems, as counted by the --error-on-problems totals
+    self.counts = dict()
+
+  def add(self, key, locale, issueType, value):
+    self.findings.setdefault(key, dict()).setdefault(locale, dict())[issueType] = value
+    if issueType in VARIABLE_ISSUE_TYPES:
+      size = len(value)
+    elif issueType in TAG_ISSUE_TYPES:
+      size = 1 if value > 0 else 0
+    else:
+      size = 1
+    localeCounts = self.counts.setdefault(locale, dict())
+    localeCounts[issueType] = localeCounts.get(issueType, 0) + size
+
+  @classmethod
+  def fromProblems(cls, problems):
+    """
+    Builds the index from the issues returned by identifyLocaleDynamicVariableDifferences (the problems file format).
+
+    Args:
+      problems (dict): A dictionary mapping each locale to its issues.
+
+    Returns:
+      IssueIndex: The index of every finding.
+    """
+    index = cls()
+    for locale, localeIssues in problems.items():
+      # Every locale with issues is counted, even if all its findings are tag differences that are not problems
+      index.counts.setdefault(locale, dict())
+      for issueType, findings in localeIssues.items():
+        if issueType in KEY_ISSUE_TYPES:
+          for key in findings:
+            index.add(key, locale, issueType, True)
+        else:
+          for key, value in findings.items():
+            index.add(key, locale, issueType, value)
+    return index
+
+  def locales(self):
+    """
+    Returns:
+      list: The locales with any finding, in the order they were validated.
+    """
+    return list(self.counts)
+
+  def query(self, key=None, locale=None, issueTypes=None, problemsOnly=False):
+    """
+    Iterates over the findings matching every given criterion.
+
+    Args:
+      key (str): Only the findings of this key.
+      locale (str): Only the findings of this locale.
+      issueTypes (iterable): Only the findings of these issue types.
+      problemsOnly (bool): Skip the tag findings that are not problems.
+
+    Returns:
+      generator: (key, locale, issue type, value) tuples.
+    """
+    keys = [key] if key is not None else list(self.findings)
+    for findingKey in keys:
+      localeFindings = self.findings.get(findingKey, {})
+      locales = [locale] if locale is not None else list(localeFindings)
+      for findingLocale in locales:
+        for issueType, value in localeFindings.get(findingLocale, {}).items():
+          if issueTypes is not None and issueType not in issueTypes:
+            continue
+          if problemsOnly and issueType in TAG_ISSUE_TYPES and value <= 0:
+            continue
+          yield findingKey, findingLocale, issueType, value
+
+  def stringsToLocales(self, issueTypes=VARIABLE_ISSUE_TYPES + TAG_ISSUE_TYPES):
+    """
+    Returns:
+      dict: A dictionary mapping each key with a problem to the locales it has a problem in.
+    """
+    stringsToLocales = dict()
+    for key, locale, _, _ in self.query(issueTypes=issueTypes, problemsOnly=True):
+      locales = stringsToLocales.setdefault(key, [])
+      if locale not in locales:
+        locales.append(locale)
+    return stringsToLocales
+
+  def localesToTagStrings(self):
+    """
+    Returns:
+      dict: A dictionary mapping each locale with a formatting tag problem to the keys with each kind of tag problem,
+        e.g. {"fr": {"b": ["key"], "br": ["key"]}}.
+    """
+    localesToStrings = dict()
+    for key, locale, issueType, _ in self.query(issueTypes=TAG_ISSUE_TYPES, problemsOnly=True):
+      localeStrings = localesToStrings.setdefault(locale, {name: [] for name in TAG_ISSUE_NAMES.values()})
+      localeStrings[TAG_ISSUE_NAMES[issueType]].append(key)
+    # Only keep the kinds of tag problems each locale has, in the order of TAG_ISSUE_NAMES
+    order = {locale: position for position, locale in enumerate(self.counts)}
+    return {
+      locale: {name: keys for name, keys in localeStrings.items() if keys}
+      for locale, localeStrings in sorted(localesToStrings.items(), key=lambda item: order[item[0]])
+    }
+
+  def localeTotals(self, locale):
+    """
+    Returns:
+      dict: The number of problems of each issue type of the locale. Variable issues count each variable.
+    """
+    return {issueType: self.counts.get(locale, {}).get(issueType, 0) for issueType in ISSUE_TYPES}
+
+  def totals(self, excludeMaster=True):
+    """
+    Returns:
+      dict: The number of problems of each issue type across all locales.
+    """
+    totals = dict.fromkeys(ISSUE_TYPES, 0)
+    for locale in self.counts:
+      if excludeMaster and locale == MASTER_LOCALE:
+        continue
+      for issueType, count in self.localeTotals(locale).items():
+        totals[issueType] += count
+    return totals
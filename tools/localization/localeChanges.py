@@ -0,0 +1,49 @@
+import os
+import sys
+
+# This allows for importing from the localization and util directories NOTE: Auto importing tools will also prepend the import paths with "tools." this will not work and needs to be removed from import paths
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from util.gitUtils import changedFiles, showFile
+from util.jsonUtils import loadsJson
+from util.logger import console
+
+
+def diffKeys(previous, current):
+  """
+  Finds the keys whose value was added, removed or modified between two versions of a locale dictionary.
+
+  Args:
+    previous (dict): The previous version of the dictionary.
+    current (dict): The current version of the dictionary.
+
+  Returns:
+    set: The changed keys.
+  """
+  changed = {key for key, value in current.items() if previous.get(key) != value}
+  changed.update(key for key in previous if key not in current)
+  return changed
+
+
+def changedLocaleKeys(ref, corpus):
+  """
+  Uses git to find which keys changed in each locale file of the corpus since a git ref.
+
+  Args:
+    ref (str): The git ref to compare the working tree against.
+    corpus (LocaleCorpus): The corpus to compare.
+
+  Returns:
+    dict: A dictionary mapping each changed locale name to the set of its changed keys.
+  """
+  locale_by_path = {os.path.normpath(path): locale for locale, path in corpus.localeFiles.items()}
+  changed = dict()
+  for path in changedFiles(ref, os.path.join(corpus.inputDir, "*", corpus.fileName)):
+    locale = locale_by_path.get(os.path.normpath(path))
+    if locale is None:
+      continue
+    previous = showFile(ref, path)
+    keys = diffKeys(loadsJson(previous) if previous else {}, corpus.locale(locale) or {})
+    console.debug(f"{locale}: {len(keys)} keys changed since {ref}")
+    if keys:
+      changed[locale] = keys
+  return changed
@@ -0,0 +1,238 @@
+import os
+import re
+import sys
+
+# This allows for importing from the localization and util directories NOTE: Auto importing tools will also prepend the import paths with "tools." this will not work and needs to be removed from import paths
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from localization.dynamicVariables import (
+  extractVariablesFromDict,
+  extractFormattingTags,
+)
+from localization.parseDictionary import parse_dictionary
+from util.logger import console
+
+MASTER_LOCALE = "en"
+PLURAL_PREFIX = "{count, plural, "
+PLURAL_PATTERN = re.compile(r"(zero|one|two|few|many|other)\s*\[([^\]]+)\]")
+
+
+def parsePluralForms(value):
+  """
+  Parses a plural string into its plural forms. The "#" shorthand is expanded to "{count}".
+
+  Args:
+    value (str): The plural string, e.g. "{count, plural, one [# message] other [# messages]}".
+
+  Returns:
+    list: A list of (form, text) tuples, e.g. [("one", "{count} message"), ("other", "{count} messages")].
+  """
+  return PLURAL_PATTERN.findall(value.replace("#", "{count}"))
+
+
+class LocaleCorpus:
+  """
+  A single view over every locale file. Each locale file is parsed at most once, on first access, and every derived
+  facet (variables, tags, plural forms, signatures, source usage) is computed lazily and cached so that scripts
+  combining validation, type generation and analysis never repeat work.
+  """
+
+  def __init__(self, inputDir="./_locales", fileName="messages.json", localeNames=None):
+    """
+    Args:
+      inputDir (str): The directory containing one sub-directory per locale.
+      fileName (str): The name of the dictionary file inside each locale directory.
+      localeNames (list): Restrict the corpus to these locales. All locales are included when None.
+    """
+    self.inputDir = inputDir
+    self.fileName = fileName
+    self._files = dict()
+    self._locales = dict()
+    self._facets = dict()
+    self._usage = None
+    self._parent = None
+    self._keys = None
+
+    for name in os.listdir(inputDir):
+      if not os.path.isdir(os.path.join(inputDir, name)):
+        continue
+      locale = name.replace("-", "_")
+      if localeNames is not None and locale not in localeNames:
+        continue
+      self._files[locale] = os.path.join(inputDir, name, fileName)
+
+  def localeNames(self):
+    """
+    Returns:
+      list: The names of the locales that have a dictionary file, in directory listing order.
+    """
+    return [name for name, path in self._files.items() if os.path.exists(path)]
+
+  def filePath(self, locale):
+    return self._files[locale]
+
+  @property
+  def localeFiles(self):
+    """
+    Returns:
+      dict: A dictionary mapping locale names to the paths of their dictionary files.
+    """
+    return dict(self._files)
+
+  @property
+  def locales(self):
+    """
+    Returns:
+      dict: A dictionary mapping locale names to their parsed dictionaries. Locales without a file are omitted.
+    """
+    return {name: self.locale(name) for name in self.localeNames()}
+
+  @property
+  def master(self):
+    return self.locale(MASTER_LOCALE)
+
+  def locale(self, locale):
+    """
+    Returns the parsed dictionary for a locale, loading it on first access.
+
+    Args:
+      locale (str): The locale name, e.g. "en" or "zh_CN".
+
+    Returns:
+      dict: The locale dictionary, or None if the locale has no dictionary file.
+    """
+    if locale not in self._locales:
+      if self._parent is not None:
+        data = self._parent.locale(locale)
+        self._locales[locale] = None if data is None else {
+          key: value for key, value in data.items() if key in self._keys
+        }
+      else:
+        console.debug(f"Loading {self._files[locale]}")
+        self._locales[locale] = parse_dictionary(self._files[locale])
+    return self._locales[locale]
+
+  def release(self, locale):
+    """
+    Drops a loaded locale and its facets, so that locales can be processed one at a time with a constant memory use.
+    The locale is loaded again if it is accessed afterwards. A subset also releases the locale of the corpus it shares
+    its files with.
+
+    Args:
+      locale (str): The locale name, e.g. "fr".
+    """
+    self._locales.pop(locale, None)
+    for cache_key in [cache_key for cache_key in self._facets if cache_key[1] == locale]:
+      del self._facets[cache_key]
+    if self._parent is not None:
+      self._parent.release(locale)
+
+  def reload(self, locale):
+    """
+    Drops a locale whose file changed, so that the file is read again on the next access. A change to the master locale
+    also drops the facets of every locale, as they depend on its keys.
+
+    Args:
+      locale (str): The locale name, e.g. "fr".
+    """
+    self.release(locale)
+    if locale == MASTER_LOCALE:
+      self._facets = dict()
+      self._usage = None
+
+  def subset(self, keys):
+    """
+    Returns a corpus restricted to the given keys. The subset shares the files already loaded by this corpus, so
+    only the facets of the selected keys are computed.
+
+    Args:
+      keys (iterable): The keys to keep in every locale.
+
+    Returns:
+      LocaleCorpus: The restricted corpus.
+    """
+    corpus = LocaleCorpus(self.inputDir, self.fileName, list(self._files))
+    corpus._parent = self
+    corpus._keys = set(keys)
+    return corpus
+
+  def _facet(self, name, locale, compute):
+    cache_key = (name, locale)
+    if cache_key not in self._facets:
+      console.debug(f"Computing {name} for {locale}")
+      self._facets[cache_key] = compute(self.locale(locale))
+    return self._facets[cache_key]
+
+  def _allVariables(self, locale):
+    return self._facet("variables", locale, extractVariablesFromDict)
+
+  def variables(self, locale):
+    """
+    Returns:
+      dict: A dictionary mapping each key of the locale to the list of dynamic variables ({name}) in its value.
+    """
+    return self._allVariables(locale)[0]
+
+  def oldVariables(self, locale):
+    """
+    Returns:
+      dict: A dictionary mapping each key of the locale to the list of old dynamic variables ($name$) in its value.
+    """
+    return self._allVariables(locale)[1]
+
+  def tags(self, locale):
+    """
+    Returns:
+      tuple: The b tags, br tags, span tags, disallowed tags and improper tags of the locale, each a dictionary
+      mapping a key to the list of matches, as returned by extractFormattingTags.
+    """
+    return self._facet("tags", locale, extractFormattingTags)
+
+  def plurals(self, locale):
+    """
+    Returns:
+      dict: A dictionary mapping each key that is a plural in the master locale to the parsed plural forms of the
+      locale's value (see parsePluralForms). Keys missing from the locale map to an empty list.
+    """
+    plural_keys = [key for key, value in self.master.items() if value.startswith(PLURAL_PREFIX)]
+    return self._facet(
+      "plurals", locale, lambda data: {key: parsePluralForms(data.get(key, "")) for key in plural_keys}
+    )
+
+  def signatures(self, locale):
+    """
+    Returns:
+      dict: A dictionary mapping each key of the locale to its canonical signature: the sorted dynamic variables
+      followed by the b, br, span, disallowed and improper tag counts.
+    """
+
+    def compute(data):
+      variables = self.variables(locale)
+      tag_facets = self.tags(locale)
+      return {
+        key: (tuple(sorted(variables[key])),) + tuple(len(facet[key]) for facet in tag_facets)
+        for key in data
+      }
+
+    return self._facet("signatures", locale, compute)
+
+  def signatureHashes(self, locale):
+    """
+    Returns:
+      dict: A dictionary mapping each key of the locale to the hash of its signature. Two strings with the same hash
+      have the same dynamic variables and tag counts, so comparing a locale to en is a single integer check per key.
+      The hashes are those of hash(), which is salted per process (see PYTHONHASHSEED): they must only be compared
+      to hashes of the same process, never persisted or sent to another process.
+    """
+    return self._facet(
+      "signatureHashes", locale, lambda data: {key: hash(signature) for key, signature in self.signatures(locale).items()}
+    )
+
+  def usage(self):
+    """
+    Returns:
+      set: The master locale keys that are referenced in the source code.
+    """
+    if self._usage is None:
+      from localization.sourceUsage import findUsedKeys
+      self._usage = findUsedKeys(self.master.keys())
+    return self._usage
@@ -0,0 +1,136 @@
+import os
+import sys
+
+# This allows for importing from the localization and util directories NOTE: Auto importing tools will also prepend the import paths with "tools." this will not work and needs to be removed from import paths
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from util.jsonUtils import loadJson
+from util.logger import console
+
+SIZE_REPORT_FILE = "./tools/localization/output/locale_sizes.json"
+SIZE_BUDGETS_FILE = "./tools/localization/sizeBudgets.json"
+
+# The thresholds a budgets file can set, all in bytes
+BUDGETS = {
+  "total_bytes": "the generated file",
+  "locale_bytes": "any locale",
+  "key_bytes": "any key (across all locales)",
+  "plural_bytes": "the plural strings",
+  "simple_bytes": "the simple strings",
+  "duplicate_of_en_bytes": "the strings identical to en in other locales",
+}
+
+
+class LocaleSizeReport:
+  """
+  Collects the size of every entry written to the generated locales file, so the output can be broken down by locale,
+  key, plural or simple strings, and strings that only duplicate en.
+  """
+
+  def __init__(self):
+    # locale -> key -> (bytes, plural, duplicate of en)
+    self.entries = dict()
+
+  def record(self, locale, key, size, plural, duplicateOfEn):
+    """
+    Args:
+      locale (str): The locale of the entry.
+      key (str): The key of the entry.
+      size (int): The size in bytes of the generated code of the entry.
+      plural (bool): Whether the key is a plural string.
+      duplicateOfEn (bool): Whether the locale has no translation of its own, or one identical to en.
+    """
+    self.entries.setdefault(locale, dict())[key] = (size, plural, duplicateOfEn and locale != "en")
+
+  def removed(self, keys):
+    """
+    Returns:
+      dict: The number of the given keys that the locale translates (rather than only duplicating en) and the bytes of
+        the given keys, as a tuple for each locale.
+    """
+    return {
+      locale: (
+        sum(1 for key in keys if key in entries and not entries[key][2]),
+        sum(entries[key][0] for key in keys if key in entries),
+      )
+      for locale, entries in self.entries.items()
+    }
+
+  def summary(self, keys=None, fileBytes=None):
+    """
+    Args:
+      keys (set): Only count these keys, e.g. the keys kept by tree shaking. Defaults to every key.
+      fileBytes (int): The size of the generated file.
+
+    Returns:
+      dict: The totals, the breakdown for each locale and the bytes of each key, largest first.
+    """
+    locales = dict()
+    keyBytes = dict()
+    for locale, entries in self.entries.items():
+      localeSummary = {"bytes": 0, "plural_bytes": 0, "simple_bytes": 0, "duplicate_of_en_bytes": 0}
+      for key, (size, plural, duplicateOfEn) in entries.items():
+        if keys is not None and key not in keys:
+          continue
+        localeSummary["bytes"] += size
+        localeSummary["plural_bytes" if plural else "simple_bytes"] += size
+        if duplicateOfEn:
+          localeSummary["duplicate_of_en_bytes"] += size
+        keyBytes[key] = keyBytes.get(key, 0) + size
+      locales[locale] = localeSummary
+
+    return {
+      "total_bytes": fileBytes,
+      "entry_bytes": sum(locale["bytes"] for locale in locales.values()),
+      "plural_bytes": sum(locale["plural_bytes"] for locale in locales.values()),
+      "simple_bytes": sum(locale["simple_bytes"] for locale in locales.values()),
+      "duplicate_of_en_bytes": sum(locale["duplicate_of_en_bytes"] for locale in locales.values()),
+      "locales": dict(sorted(locales.items(), key=lambda item: item[1]["bytes"], reverse=True)),
+      "keys": dict(sorted(keyBytes.items(), key=lambda item: item[1], reverse=True)),
+    }
+
+
+def printSizeSummary(summary, top=10):
+  console.info(f"Generated file: {summary['total_bytes']} bytes, locale strings: {summary['entry_bytes']} bytes")
+  console.info(
+    f"Plural strings: {summary['plural_bytes']} bytes, simple strings: {summary['simple_bytes']} bytes, "
+    f"duplicates of en: {summary['duplicate_of_en_bytes']} bytes")
+  console.info(f"{'Locale':<10} | {'Bytes':>8} | {'Plural':>8} | {'Simple':>8} | {'Dup. of en':>10}")
+  for locale, sizes in list(summary["locales"].items())[:top]:
+    console.info(
+      f"{locale:<10} | {sizes['bytes']:>8} | {sizes['plural_bytes']:>8} | {sizes['simple_bytes']:>8} | "
+      f"{sizes['duplicate_of_en_bytes']:>10}")
+  console.info(f"{'Key':<50} | {'Bytes':>8}")
+  for key, size in list(summary["keys"].items())[:top]:
+    console.info(f"{key:<50} | {size:>8}")
+
+
+def loadSizeBudgets(filePath):
+  """
+  Loads a budgets file, a JSON object mapping any of the BUDGETS to a maximum number of bytes. A "locales" object can
+  set the maximum bytes of individual locales, overriding locale_bytes.
+  """
+  budgets = loadJson(filePath)
+  unknown = [name for name in budgets if name not in BUDGETS and name != "locales"]
+  if unknown:
+    raise ValueError(f"Unknown size budgets in {filePath}: {', '.join(unknown)}")
+  return budgets
+
+
+def checkSizeBudgets(summary, budgets):
+  """
+  Returns:
+    list: A message for every budget that is exceeded.
+  """
+  exceeded = []
+
+  def check(name, size, budget):
+    if budget is not None and size is not None and size > budget:
+      exceeded.append(f"{name} is {size} bytes, over its budget of {budget} bytes by {size - budget} bytes")
+
+  for budget in ("total_bytes", "plural_bytes", "simple_bytes", "duplicate_of_en_bytes"):
+    check(BUDGETS[budget].capitalize(), summary[budget], budgets.get(budget))
+  for locale, sizes in summary["locales"].items():
+    check(f"Locale {locale}", sizes["bytes"], budgets.get("locales", {}).get(locale, budgets.get("locale_bytes")))
+  for key, size in summary["keys"].items():
+    check(f"Key {key}", size, budgets.get("key_bytes"))
+  return exceeded
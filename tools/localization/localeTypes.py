@@ -1,8 +1,31 @@
 #!/bin/python3
+import fnmatch
+import hashlib
+import multiprocessing
+import os
 import re
 from typing import List, Tuple
 
+import localization.dynamicVariables
+import localization.localeCorpus
+import localization.parseDictionary
+import util.jsonUtils
+from localization.dynamicVariables import DYNAMIC_VARIABLE_PATTERN
+from util.fileUtils import openAtomically, removeFileIfExists, writeFile
+from util.jsonUtils import dumpsJson, loadJson
+
 OUTPUT_FILE = "./ts/localization/locales.ts"
+KEEP_TOKENS_FILE = "./tools/localization/keepTokens.txt"
+CRITICAL_ENTRIES_FILE = "./tools/localization/criticalEntries.txt"
+# The chunks written instead of a single dictionary when the strings rendered on startup are split from the others
+CRITICAL_OUTPUT_FILE = "./ts/localization/locales.critical.ts"
+DEFERRED_OUTPUT_FILE = "./ts/localization/locales.deferred.ts"
+# The number of imports followed from an entry file. The import graph is so connected that following every import
+# reaches most of the app, while the files rendered on startup are within a couple of imports of the entry files.
+CRITICAL_IMPORT_DEPTH = 2
+
+# The variables that replace_static_strings substitutes with a fixed value
+STATIC_VARIABLES = ("app_name", "session_download_url", "oxen_foundation")
 
 
 def wrapValue(value):
@@ -57,11 +80,18 @@ def escape_new_lines(value):
 
 
 def extract_vars(text):
-    # Use a regular expression to find all strings inside curly braces
-    vars = re.findall(r'\{(.*?)\}', text)
+    # Use the same pattern as the validation to find all dynamic variables inside curly braces
+    vars = re.findall(DYNAMIC_VARIABLE_PATTERN, text)
     return vars
 
 
+def remove_static_vars(vars):
+    """
+    Removes the variables that are replaced by replace_static_strings, as they are not arguments of the string.
+    """
+    return [var for var in vars if var not in STATIC_VARIABLES]
+
+
 def vars_to_record(vars):
     arr = []
     for var in vars:
@@ -75,99 +105,311 @@ def vars_to_record(vars):
     return "{" + ', '.join(arr) + "}"
 
 
-def replace_static_strings(str):
+def replace_static_variables(str):
     # todo make those come from the glossary
-    replaced =  str.replace("{app_name}", "Session")\
+    return str.replace("{app_name}", "Session")\
       .replace("{session_download_url}", "https://getsession.org/download")\
       .replace("{session_download_url}", "GIF")\
-      .replace("{oxen_foundation}", "Oxen Foundation")\
-      .replace("\"", "\\\"")
-    return replaced
+      .replace("{oxen_foundation}", "Oxen Foundation")
+
+
+def replace_static_strings(str):
+    return replace_static_variables(str).replace("\"", "\\\"")
+
+
+# Matches the formatting tags the same way as the stripping of localeTools.ts used to at runtime
+TAG_PATTERN = re.compile(r"<[^>]*>")
+
+
+def utf16_length(value):
+    return len(value.encode("utf-16-le")) // 2
+
+
+def tag_ranges(value):
+    """
+    Finds the formatting tags of a string, so that the runtime can remove them without parsing the string.
+
+    Args:
+      value (str): The string as it is at runtime, with its static variables replaced.
+
+    Returns:
+      list: The start and end of every tag, flattened, as offsets in UTF-16 code units like the indices of a JavaScript
+        string. Empty if the string has no tag.
+    """
+    ranges = []
+    position = 0
+    offset = 0
+    for match in TAG_PATTERN.finditer(value):
+        offset += utf16_length(value[position:match.start()])
+        ranges.append(offset)
+        offset += utf16_length(match.group())
+        ranges.append(offset)
+        position = match.end()
+    return ranges
+
+
+def tags_to_type(tags, indent):
+    """
+    Returns:
+      str: The tags property of an entry, with the tag ranges of the locales whose string has tags, or an empty string
+        if no string of the entry has any.
+    """
+    if not tags:
+        return ""
+    return f"{indent}tags: {{ {', '.join(f'{locale}: {ranges}' for locale, ranges in tags)} }},\n"
 
 
 def args_to_type(args):
    return args if args else 'undefined,'
 
 
-def generate_type_object(locales):
+class TypeGenerationContext:
+    """
+    The data needed to render the types of any key, computed once and shared with every worker process. The values that
+    only depend on the locale, such as its wrapped name, are computed here rather than for every key.
+    """
+
+    def __init__(self, corpus, record_sizes=False):
+        self.locale_names = corpus.localeNames()
+        self.wrapped_locale_names = [wrapValue(locale.replace("_", "-")) for locale in self.locale_names]
+        self.master = corpus.master
+        self.variables_en = corpus.variables('en')
+        self.plurals = {locale: corpus.plurals(locale) for locale in self.locale_names}
+        self.locales = {locale: corpus.locale(locale) for locale in self.locale_names}
+        self.record_sizes = record_sizes
+
+
+# The context of the current process, set by init_type_generation
+_context = None
+
+
+def init_type_generation(context):
+    global _context
+    _context = context
+
+
+def render_plural_key(context, key):
+    en_plurals_with_token = context.plurals['en'][key]
+
+    if not en_plurals_with_token:
+       raise ValueError("invalid plural string")
+
+    all_locales_plurals = []
+    all_locales_tags = []
+    sizes = []
+
+    extracted_vars = remove_static_vars(extract_vars(en_plurals_with_token[0][1]))
+    if('count' not in extracted_vars):
+        extracted_vars.append('count')
+    as_record_type_en = vars_to_record(extracted_vars)
+
+    for locale, wrapped_locale in zip(context.locale_names, context.wrapped_locale_names):
+      js_plural_object = ""
+
+      plurals_with_token = context.plurals[locale][key]
+
+      all_locales_strings = []
+      form_tags = []
+
+      for token, localized_string in plurals_with_token:
+        if localized_string:
+          to_append = ""
+          to_append += token
+          to_append += f": \"{escape_new_lines(replace_static_strings(localized_string))}\""
+          all_locales_strings.append(to_append)
+          form_tags.append((token, tag_ranges(replace_static_variables(localized_string))))
+
+      # if that locale doesn't have translation in plurals, add the english hones
+      if not len(all_locales_strings):
+         for plural_en_token, plural_en_str in en_plurals_with_token:
+            all_locales_strings.append(f"{plural_en_token}: \"{escape_new_lines(plural_en_str)}\"")
+            form_tags.append((plural_en_token, tag_ranges(plural_en_str)))
+
+      form_tags = [(token, ranges) for token, ranges in form_tags if ranges]
+      if form_tags:
+        all_locales_tags.append(
+          (wrapped_locale, f"{{ {', '.join(f'{token}: {ranges}' for token, ranges in form_tags)} }}"))
+      js_plural_object += f"    {wrapped_locale}:"
+      js_plural_object += "{\n      "
+      js_plural_object += ",\n      ".join(all_locales_strings)
+      js_plural_object += "\n    },"
+
+      if context.record_sizes:
+        sizes.append((locale, len(js_plural_object.encode("utf-8")),
+                      plurals_with_token == en_plurals_with_token or not any(s for _, s in plurals_with_token)))
+      all_locales_plurals.append(js_plural_object)
+    locales_plurals = "\n".join(all_locales_plurals)
+    entry = f'  {wrapValue(key)}: {{\n{locales_plurals}\n{tags_to_type(all_locales_tags, "    ")}    args: {args_to_type(as_record_type_en)}\n  }},\n'
+    return entry, sizes
+
+
+def render_simple_key(context, key):
+    replaced_en = replace_static_strings(context.master[key])
+    extracted_vars_en = remove_static_vars(context.variables_en[key])
+    as_record_type_en = vars_to_record(extracted_vars_en)
+
+    all_locales_strings = []
+    all_locales_tags = []
+    sizes = []
+    for locale, wrapped_locale in zip(context.locale_names, context.wrapped_locale_names):
+      value = context.locales[locale].get(key, "") or context.master[key]
+      replaced_val = replace_static_strings(context.locales[locale].get(key, ""))
+      if replaced_val:
+        locale_string = f'{wrapped_locale}: "{escape_new_lines(replaced_val)}"'
+      else:
+        locale_string = f'{wrapped_locale}: "{escape_new_lines(replaced_en)}"'
+      all_locales_strings.append(locale_string)
+      ranges = tag_ranges(replace_static_variables(value))
+      if ranges:
+        all_locales_tags.append((wrapped_locale, ranges))
+      if context.record_sizes:
+        sizes.append((locale, len(locale_string.encode("utf-8")), replaced_val in ("", replaced_en)))
+
+    locales_strings = ",\n      ".join(all_locales_strings)
+    entry = f'  {wrapValue(key)}: {{\n      {locales_strings},\n{tags_to_type(all_locales_tags, "      ")}      args: {args_to_type(as_record_type_en)}\n  }},\n'
+    return entry, sizes
+
+
+def render_keys(keys):
+    """
+    Renders the entries of a chunk of keys with the context of the current process.
+
+    Returns:
+      list: (key, is plural, entry, sizes) tuples in the order of the keys, where sizes is a list of (locale, bytes,
+        duplicate of en) tuples if the context records sizes.
+    """
+    rendered = []
+    for key in keys:
+        is_plural = key in _context.plurals['en']
+        entry, sizes = render_plural_key(_context, key) if is_plural else render_simple_key(_context, key)
+        rendered.append((key, is_plural, entry, sizes))
+    return rendered
+
+
+# Each worker renders several chunks so that a slow chunk does not hold up the others
+CHUNKS_PER_WORKER = 4
+
+
+def render_entries(corpus, size_report=None, workers=None):
     """
-    Generate a JavaScript type from a dictionary.
+    Renders the entry of every key of the en locale. The keys are split into chunks rendered on a process pool, and the
+    chunks are joined in key order so the result is identical to rendering them one at a time.
 
     Args:
-      data (dict): The dictionary containing key-value pairs.
+      corpus (LocaleCorpus): The corpus containing every locale.
+      size_report (LocaleSizeReport): If given, records the size of the entry of every key for every locale.
+      workers (int): The number of worker processes. Defaults to the number of CPUs, 1 renders in this process.
+
+    Returns:
+      list: (key, is plural, entry) tuples in key order.
+    """
+    context = TypeGenerationContext(corpus, size_report is not None)
+    workers = workers or os.cpu_count() or 1
+
+    all_keys = list(corpus.master)
+    chunk_size = max(1, -(-len(all_keys) // (workers * CHUNKS_PER_WORKER)))
+    chunks = [all_keys[i:i + chunk_size] for i in range(0, len(all_keys), chunk_size)]
+
+    if workers > 1:
+        with multiprocessing.Pool(workers, initializer=init_type_generation, initargs=(context,)) as pool:
+            rendered_chunks = pool.map(render_keys, chunks)
+    else:
+        init_type_generation(context)
+        rendered_chunks = map(render_keys, chunks)
+
+    entries = []
+    for rendered in rendered_chunks:
+        for key, is_plural, entry, sizes in rendered:
+            if size_report is not None:
+                for locale, size, duplicate_of_en in sizes:
+                    size_report.record(locale, key, size, is_plural, duplicate_of_en)
+            entries.append((key, is_plural, entry))
+    return entries
+
+
+def generate_type_object(corpus, keys=None, size_report=None, workers=None):
+    """
+    Generate a JavaScript type from a locale corpus.
+
+    Args:
+      corpus (LocaleCorpus): The corpus containing every locale.
+      keys (set): The keys to emit. Defaults to every key of the en locale.
+      size_report (LocaleSizeReport): If given, records the size of the entry of every key (including the ones that are
+        not emitted) for every locale.
+      workers (int): The number of worker processes, see render_entries.
 
     Returns:
       str: A string representation of the JavaScript object.
     """
     js_object = "{\n"
     js_plural_object_container = "{\n"
-    plural_pattern = r"(zero|one|two|few|many|other)\s*\[([^\]]+)\]"
 
-    for key, value_en in locales['en'].items():
-        if value_en.startswith("{count, plural, "):
-            extracted_vars_en = extract_vars(replaced_en)
-            plurals_other = [[locale, replace_static_strings(data.get(key, ""))] for locale, data in locales.items()]
-            en_plurals_with_token = re.findall(plural_pattern, value_en.replace('#', '{count}'))
-
-            if not en_plurals_with_token:
-               raise ValueError("invalid plural string")
+    for key, is_plural, entry in render_entries(corpus, size_report, workers):
+        if keys is not None and key not in keys:
+            continue
+        if is_plural:
+            js_plural_object_container += entry
+        else:
+            js_object += entry
 
-            all_locales_plurals = []
+    js_object += "}"
+    js_plural_object_container += "}"
+    return js_object,js_plural_object_container
 
-            extracted_vars = extract_vars(replace_static_strings(en_plurals_with_token[0][1]))
-            if('count' not in extracted_vars):
-                extracted_vars.append('count')
 
-            for plural in plurals_other:
-              js_plural_object = ""
+def load_list_file(file_path):
+    """
+    Args:
+      file_path (str): A file with one item per line. Lines starting with # are comments.
 
-              locale_key = plural[0].replace("_","-") # 'lo', 'th', 'zh-CN', ....
-              plural_str = plural[1].replace('#', '{count}')
+    Returns:
+      list: The items, or an empty list if the file does not exist.
+    """
+    if not os.path.exists(file_path):
+        return []
+    with open(file_path, "r", encoding="utf-8") as file:
+        lines = [line.strip() for line in file]
+    return [line for line in lines if line and not line.startswith("#")]
 
-              plurals_with_token = re.findall(plural_pattern, plural_str)
 
+def load_keep_tokens(file_path=KEEP_TOKENS_FILE):
+    """
+    Loads the tokens to keep when tree shaking even though they are not referenced as a literal in the source code.
 
-              all_locales_strings = []
-              as_record_type_en = vars_to_record(extracted_vars)
+    Args:
+      file_path (str): A file with one token or glob pattern (e.g. callsError*) per line.
 
-              for token, localized_string in plurals_with_token:
-                if localized_string:
-                  to_append = ""
-                  to_append += token
-                  to_append += f": \"{escape_new_lines(localized_string)}\""
-                  all_locales_strings.append(to_append)
+    Returns:
+      list: The tokens and patterns, or an empty list if the file does not exist.
+    """
+    return load_list_file(file_path)
 
-              # if that locale doesn't have translation in plurals, add the english hones
-              if not len(all_locales_strings):
-                 for plural_en_token, plural_en_str in en_plurals_with_token:
-                    all_locales_strings.append(f"{plural_en_token}: \"{escape_new_lines(plural_en_str)}\"")
-              js_plural_object += f"    {wrapValue(locale_key)}:"
-              js_plural_object += "{\n      "
-              js_plural_object += ",\n      ".join(all_locales_strings)
-              js_plural_object += "\n    },"
 
-              all_locales_plurals.append(js_plural_object)
-            js_plural_object_container += f'  {wrapValue(key)}: {{\n{"\n".join(all_locales_plurals)}\n    args: {args_to_type(as_record_type_en)}\n  }},\n'
+def load_critical_entries(file_path=CRITICAL_ENTRIES_FILE):
+    """
+    Loads the entry files of the components rendered on startup, whose strings go in the critical chunk.
 
-        else:
-          replaced_en = replace_static_strings(value_en)
-          extracted_vars_en = extract_vars(replaced_en)
-          as_record_type_en = vars_to_record(extracted_vars_en)
-          other_locales_replaced_values = [[locale, replace_static_strings(data.get(key, ""))] for locale, data in locales.items()]
+    Args:
+      file_path (str): A file with the path of one entry file per line.
 
-          all_locales_strings = []
-          for locale, replaced_val in other_locales_replaced_values:
-            if replaced_val:
-              all_locales_strings.append(f'{wrapValue(locale.replace("_","-"))}: "{escape_new_lines(replaced_val)}"')
-            else:
-              all_locales_strings.append(f'{wrapValue(locale.replace("_","-"))}: "{escape_new_lines(replaced_en)}"')
+    Returns:
+      list: The paths of the entry files.
+    """
+    entries = load_list_file(file_path)
+    if not entries:
+        raise ValueError(f"No critical entry files found in {file_path}")
+    return entries
 
-          # print('key',key, " other_locales_replaced_values:", other_locales_replaced_values)
-          js_object += f'  {wrapValue(key)}: {{\n      {",\n      ".join(all_locales_strings)},\n      args: {args_to_type(as_record_type_en)}\n  }},\n'
 
-    js_object += "}"
-    js_plural_object_container += "}"
-    return js_object,js_plural_object_container
+def select_tree_shaken_keys(keys, referenced_keys, keep_tokens):
+    """
+    Returns:
+      set: The keys that are referenced in the source code or match one of the tokens or patterns to keep.
+    """
+    return {
+        key for key in keys
+        if key in referenced_keys or any(fnmatch.fnmatchcase(key, pattern) for pattern in keep_tokens)
+    }
 
 
 DISCLAIMER = """
@@ -200,31 +442,254 @@ def generateLocalesType(locale, data):
     return f"Locales generated at: {OUTPUT_FILE}"
 
 
-def generateLocalesMergedType(locales):
+DICT_VAR = "simpleDictionary"
+PLURAL_DICT_VAR = "pluralsDictionary"
+# The parts of the generated file around the entries of each dictionary
+OUTPUT_HEADER = f"{DISCLAIMER}\nexport const {DICT_VAR} = {{\n"
+OUTPUT_SEPARATOR = f"}} as const;\n\nexport const {PLURAL_DICT_VAR} = {{\n"
+OUTPUT_FOOTER = "} as const;\n"
+# The merged type has every string, so the app has no deferred strings to load, see generateLocalesChunkedType
+MERGED_OUTPUT_FOOTER = f"""{OUTPUT_FOOTER}
+// Every string is in this file, there are no deferred strings to load
+export async function loadDeferredLocales() {{}}
+"""
+
+# The sidecar index of the generated file, used to patch it incrementally
+OUTPUT_INDEX_FILE = "./tools/localization/output/locales.index.json"
+OUTPUT_INDEX_VERSION = 1
+
+
+def file_stamp(file_path):
+    stat = os.stat(file_path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+# The modules the rendered entries depend on: the generator, the parsing of the locale files and the extraction of
+# their dynamic variables and plural forms
+GENERATOR_MODULES = (
+    __file__,
+    localization.dynamicVariables.__file__,
+    localization.localeCorpus.__file__,
+    localization.parseDictionary.__file__,
+    util.jsonUtils.__file__,
+)
+
+
+def generator_hash():
+    # Any change to the generator invalidates the index, as it could change the output of every key
+    digest = hashlib.sha1()
+    for module_file in GENERATOR_MODULES:
+        with open(module_file, "rb") as file:
+            digest.update(file.read())
+    return digest.hexdigest()
+
+
+def keys_hash(keys):
+    return None if keys is None else hashlib.sha1("\0".join(sorted(keys)).encode("utf-8")).hexdigest()
+
+
+def key_fingerprints(corpus):
     """
-    Generate the locales type and write it to a file.
+    Returns:
+      dict: A hash of the inputs of every key (its value in every locale) mapped by key.
+    """
+    locales = [corpus.locale(locale) for locale in corpus.localeNames()]
+    return {
+        key: hashlib.blake2b("\0".join(locale.get(key, "") for locale in locales).encode("utf-8"),
+                             digest_size=8).hexdigest()
+        for key in corpus.master
+    }
+
+
+def write_output(content, index):
+    """
+    Writes the generated file and its index. The file is replaced atomically so an interrupted run never leaves a
+    truncated file behind.
+    """
+    with openAtomically(OUTPUT_FILE, "wb") as ts_file:
+        ts_file.write(content)
+    index["output"] = file_stamp(OUTPUT_FILE)
+    writeFile(OUTPUT_INDEX_FILE, dumpsJson(index))
+
+
+def generateLocalesMergedType(corpus, keys=None, size_report=None, workers=None):
+    """
+    Generate the locales type and write it to a file, along with an index of the byte range of every entry so that
+    patchLocalesMergedType can update it.
 
     Args:
-      locale: The locale dictionary containing the localization data.
+      corpus (LocaleCorpus): The corpus containing the localization data.
+      keys (set): The keys to emit, see generate_type_object.
+      size_report (LocaleSizeReport): Records the size of every entry, see generate_type_object.
+      workers (int): The number of worker processes, see render_entries.
     """
+    entries = render_entries(corpus, size_report, workers)
+    fingerprints = key_fingerprints(corpus)
+
+    content = bytearray(OUTPUT_HEADER.encode("utf-8"))
+    index_entries = []
+    # The simple strings come first, then the plurals
+    for plural_section in (False, True):
+        if plural_section:
+            content += OUTPUT_SEPARATOR.encode("utf-8")
+        for key, is_plural, entry in entries:
+            if is_plural != plural_section:
+                continue
+            emitted = keys is None or key in keys
+            start = len(content)
+            if emitted:
+                content += entry.encode("utf-8")
+            index_entries.append([key, is_plural, emitted, fingerprints[key], start, len(content)])
+    content += MERGED_OUTPUT_FOOTER.encode("utf-8")
+
+    # The chunks of a previous generateLocalesChunkedType are no longer imported
+    removeFileIfExists(CRITICAL_OUTPUT_FILE)
+    removeFileIfExists(DEFERRED_OUTPUT_FILE)
+    write_output(bytes(content), {
+        "version": OUTPUT_INDEX_VERSION,
+        "generator": generator_hash(),
+        "keys": keys_hash(keys),
+        "locales": corpus.localeNames(),
+        "files": {locale: file_stamp(corpus.filePath(locale)) for locale in corpus.localeNames()},
+        "entries": index_entries,
+    })
 
-    # write the locale_dict to a file
-    with open(OUTPUT_FILE, "w", encoding='utf-8') as ts_file:
-        ts_file.write(
-            f"{DISCLAIMER}"
-        )
+    return f"Locales generated at: {OUTPUT_FILE}"
 
-        dicts = generate_type_object(locales)
 
-        dictVar = "simpleDictionary"
-        pluralDictVar = "pluralsDictionary"
+def patchLocalesMergedType(corpus, keys=None):
+    """
+    Updates the generated locales type in place: only the entries of the keys whose value changed in any locale are
+    rendered again and spliced into the file, using the byte ranges recorded by the previous generation.
 
+    Args:
+      corpus (LocaleCorpus): The corpus containing the localization data.
+      keys (set): The keys to emit, see generate_type_object.
 
-        ts_file.write(f"""
-export const {dictVar} = {dicts[0]} as const;
+    Returns:
+      str: A message describing the update, or None if the file must be fully regenerated instead: there is no index,
+        the generator, options or output file changed since, or keys were added, removed, reordered or changed between
+        simple and plural.
+    """
+    if not os.path.exists(OUTPUT_INDEX_FILE) or not os.path.exists(OUTPUT_FILE):
+        return None
+    index = loadJson(OUTPUT_INDEX_FILE)
+    if (
+        index.get("version") != OUTPUT_INDEX_VERSION
+        or index["generator"] != generator_hash()
+        or index["keys"] != keys_hash(keys)
+        or index["locales"] != corpus.localeNames()
+        or index["output"] != file_stamp(OUTPUT_FILE)
+    ):
+        return None
+
+    files = {locale: file_stamp(corpus.filePath(locale)) for locale in corpus.localeNames()}
+    if files == index["files"]:
+        return f"Locales up to date at: {OUTPUT_FILE}"
+
+    # The index lists the simple strings, then the plurals, each in the order of the en locale
+    plurals_en = corpus.plurals("en")
+    structure = [
+        [key, plural_section, keys is None or key in keys]
+        for plural_section in (False, True) for key in corpus.master if (key in plurals_en) == plural_section
+    ]
+    if structure != [[key, is_plural, emitted] for key, is_plural, emitted, _, _, _ in index["entries"]]:
+        return None
+
+    fingerprints = key_fingerprints(corpus)
+    changed_keys = [key for key, _, emitted, fingerprint, _, _ in index["entries"]
+                    if emitted and fingerprints[key] != fingerprint]
+
+    if changed_keys:
+        init_type_generation(TypeGenerationContext(corpus))
+        rendered = {key: entry.encode("utf-8") for key, _, entry, _ in render_keys(changed_keys)}
+        with open(OUTPUT_FILE, "rb") as ts_file:
+            previous = ts_file.read()
+        content = bytearray()
+        position = 0
+        for index_entry in index["entries"]:
+            key, _, _, _, start, end = index_entry
+            content += previous[position:start]
+            index_entry[4] = len(content)
+            content += rendered.get(key, previous[start:end])
+            index_entry[5] = len(content)
+            position = end
+        content += previous[position:]
+    else:
+        with open(OUTPUT_FILE, "rb") as ts_file:
+            content = ts_file.read()
+
+    for index_entry in index["entries"]:
+        index_entry[3] = fingerprints[index_entry[0]]
+    index["files"] = files
+    write_output(bytes(content), index)
+
+    return f"Locales patched at: {OUTPUT_FILE} ({len(changed_keys)} keys updated)"
+
+
+def write_dictionaries(file_path, entries, keys):
+    simple_entries = "".join(entry for key, is_plural, entry in entries if not is_plural and key in keys)
+    plural_entries = "".join(entry for key, is_plural, entry in entries if is_plural and key in keys)
+    writeFile(file_path, f"{OUTPUT_HEADER}{simple_entries}{OUTPUT_SEPARATOR}{plural_entries}{OUTPUT_FOOTER}")
+
+
+def generateLocalesChunkedType(corpus, critical_keys, keys=None, size_report=None, workers=None):
+    """
+    Generate the locales type split into a critical chunk, with the strings of the components rendered on startup, and
+    a deferred chunk with every other string. The locales type exports the same dictionaries as
+    generateLocalesMergedType, which only have the critical strings until the app calls loadDeferredLocales: the
+    deferred chunk is imported dynamically, so the first window is shown without loading it.
 
-export const {pluralDictVar} = {dicts[1]} as const;
-""")
+    Args:
+      corpus (LocaleCorpus): The corpus containing the localization data.
+      critical_keys (set): The keys of the critical chunk.
+      keys (set): The keys to emit, see generate_type_object.
+      size_report (LocaleSizeReport): Records the size of every entry, see generate_type_object.
+      workers (int): The number of worker processes, see render_entries.
 
-    return f"Locales generated at: {OUTPUT_FILE}"
+    Returns:
+      str: A message describing the chunks.
+    """
+    entries = render_entries(corpus, size_report, workers)
+    emitted_keys = set(corpus.master) if keys is None else set(keys)
+    critical_keys = emitted_keys.intersection(critical_keys)
+
+    write_dictionaries(CRITICAL_OUTPUT_FILE, entries, critical_keys)
+    write_dictionaries(DEFERRED_OUTPUT_FILE, entries, emitted_keys.difference(critical_keys))
+    writeFile(OUTPUT_FILE, f"""{DISCLAIMER}import * as critical from './locales.critical';
+
+type Deferred = typeof import('./locales.deferred');
+
+// Only the critical strings are loaded on startup, loadDeferredLocales adds the others
+export const {DICT_VAR} = {{
+  ...critical.{DICT_VAR},
+}} as typeof critical.{DICT_VAR} & Deferred['{DICT_VAR}'];
+
+export const {PLURAL_DICT_VAR} = {{
+  ...critical.{PLURAL_DICT_VAR},
+}} as typeof critical.{PLURAL_DICT_VAR} & Deferred['{PLURAL_DICT_VAR}'];
+
+let deferredLoaded: Promise<void> | undefined;
+
+async function loadDeferred() {{
+  const deferred = await import('./locales.deferred');
+  Object.assign({DICT_VAR}, deferred.{DICT_VAR});
+  Object.assign({PLURAL_DICT_VAR}, deferred.{PLURAL_DICT_VAR});
+}}
+
+/**
+ * Loads the strings that are not rendered on startup. The first window calls it once rendered, the other windows and
+ * the main process await it before using them.
+ */
+export function loadDeferredLocales() {{
+  if (!deferredLoaded) {{
+    deferredLoaded = loadDeferred();
+  }}
+  return deferredLoaded;
+}}
+""")
+    # The index of the merged type no longer describes the locales type
+    removeFileIfExists(OUTPUT_INDEX_FILE)
 
+    return (f"Locales generated at: {OUTPUT_FILE} ({len(critical_keys)} keys in {CRITICAL_OUTPUT_FILE}, "
+            f"{len(emitted_keys) - len(critical_keys)} keys in {DEFERRED_OUTPUT_FILE})")
@@ -0,0 +1,444 @@
+#!/bin/python3
+import argparse
+import bisect
+import os
+import re
+import sys
+import traceback
+from urllib.parse import quote, unquote, urlparse
+
+# This allows for importing from the localization and util directories NOTE: Auto importing tools will also prepend the import paths with "tools." this will not work and needs to be removed from import paths
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from localization.dynamicVariables import extractVariablesFromDict
+from localization.localeCorpus import LocaleCorpus, MASTER_LOCALE
+from localization.sourceUsage import (
+  find_source_files,
+  load_file,
+  should_ignore_file,
+  SOURCE_EXTENSIONS,
+  STRING_LITERAL_PATTERN,
+  TOKEN_CALL_SITE_PATTERN,
+)
+from util.jsonUtils import dumpsJson, loadsJson
+from util.listUtils import missingFromList
+from util.logger import console
+
+# The protocol is spoken over stdout, main redirects everything the tools print to stderr
+protocol_output = sys.stdout.buffer
+
+# The error codes and constants of the language server protocol
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+TEXT_DOCUMENT_SYNC_FULL = 1
+COMPLETION_ITEM_KIND_CONSTANT = 21
+DIAGNOSTIC_ERROR = 1
+DIAGNOSTIC_WARNING = 2
+FILE_DELETED = 3
+
+# The string literal being typed at the end of a line, for the completion of tokens
+OPEN_LITERAL_PATTERN = re.compile(r"""(['"`])(\w*)$""")
+WORD_PATTERN = re.compile(r"\w+")
+LOCALE_KEY_PATTERN = re.compile(r'^\s*"(\w+)"\s*:', re.MULTILINE)
+
+parser = argparse.ArgumentParser(
+  description="A localization language server over stdio, for editor integrations. It keeps the locales and the "
+              "usages of every token in memory and serves the completion of tokens, the translations of a token on "
+              "hover, the usages of a token and diagnostics for unknown tokens and variable mismatches."
+)
+parser.add_argument("--dict-dir", type=str, default="./_locales")
+parser.add_argument("--dict-file-name", type=str, default="messages.json")
+parser.add_argument("--debug", action="store_true", help="Enable debug mode, logged to stderr")
+
+
+def uri_to_path(uri):
+  # The paths are relative to the repository, the same way as the source files of the other tools
+  return "./" + os.path.relpath(unquote(urlparse(uri).path)).replace(os.sep, "/")
+
+
+def path_to_uri(path):
+  return "file://" + quote(os.path.abspath(path).replace(os.sep, "/"))
+
+
+def utf16_length(text):
+  # The positions of the protocol count UTF-16 code units
+  return len(text.encode("utf-16-le")) // 2
+
+
+def to_position(content, offset, line_starts):
+  """
+  Returns:
+    dict: The protocol position of an offset of the content.
+  """
+  line = bisect.bisect_right(line_starts, offset) - 1
+  return {"line": line, "character": utf16_length(content[line_starts[line]:offset])}
+
+
+def line_starts_of(content):
+  return [0] + [match.end() for match in re.finditer("\n", content)]
+
+
+def to_range(content, start, end, line_starts=None):
+  line_starts = line_starts or line_starts_of(content)
+  return {"start": to_position(content, start, line_starts), "end": to_position(content, end, line_starts)}
+
+
+def line_at(content, line):
+  lines = content.split("\n")
+  return lines[line] if line < len(lines) else ""
+
+
+def column_of(text, character):
+  """
+  Returns:
+    int: The index in the text of a protocol character position.
+  """
+  units = 0
+  for index, char in enumerate(text):
+    if units >= character:
+      return index
+    units += 2 if ord(char) > 0xFFFF else 1
+  return len(text)
+
+
+class LocalizationServer:
+  """
+  Keeps the locale corpus and an index of the token literals of every source file in memory. The index is updated one
+  file at a time, from the open documents or the file change notifications, and the locales are read again when their
+  file changes, so every query is answered from memory.
+  """
+
+  def __init__(self, dict_dir, dict_file_name):
+    self.dict_dir = dict_dir
+    self.dict_file_name = dict_file_name
+    self.corpus = LocaleCorpus(dict_dir, dict_file_name)
+    # The content of the documents open in the editor, which may not be saved yet
+    self.documents = dict()
+    # source file -> token -> list of (start, end) offsets of its literals
+    self.usages = dict()
+    self.shutdown_requested = False
+    self.handlers = {
+      "initialize": self.initialize,
+      "shutdown": self.shutdown,
+      "textDocument/completion": self.completion,
+      "textDocument/hover": self.hover,
+      "textDocument/references": self.references,
+    }
+    self.notification_handlers = {
+      "textDocument/didOpen": self.did_open,
+      "textDocument/didChange": self.did_change,
+      "textDocument/didClose": self.did_close,
+      "workspace/didChangeWatchedFiles": self.did_change_watched_files,
+    }
+
+  def keys(self):
+    return self.corpus.master
+
+  def content(self, path):
+    if path in self.documents:
+      return self.documents[path]
+    return load_file(path) if os.path.isfile(path) else ""
+
+  def locale_of(self, path):
+    """
+    Returns:
+      str: The locale of a locale file, or None if the path is not a locale file.
+    """
+    directory, file_name = os.path.split(os.path.normpath(path))
+    if file_name != self.dict_file_name or os.path.dirname(directory) != os.path.normpath(self.dict_dir):
+      return None
+    return os.path.basename(directory).replace("-", "_")
+
+  def is_source_file(self, path):
+    return path.endswith(SOURCE_EXTENSIONS) and not should_ignore_file(path)
+
+  def index_file(self, path):
+    content = self.content(path)
+    keys = self.keys()
+    usages = dict()
+    for match in STRING_LITERAL_PATTERN.finditer(content):
+      if match.group(2) in keys:
+        usages.setdefault(match.group(2), []).append((match.start(2), match.end(2)))
+    self.usages[path] = usages
+
+  def index_sources(self):
+    for path in find_source_files():
+      self.index_file(path)
+    console.debug(f"Indexed the token usages of {len(self.usages)} source files")
+
+  # Lifecycle
+
+  def initialize(self, params):
+    self.index_sources()
+    return {
+      "capabilities": {
+        "textDocumentSync": TEXT_DOCUMENT_SYNC_FULL,
+        "completionProvider": {"triggerCharacters": ["'", '"', "`"]},
+        "hoverProvider": True,
+        "referencesProvider": True,
+      },
+      "serverInfo": {"name": "session-localization"},
+    }
+
+  def shutdown(self, params):
+    self.shutdown_requested = True
+    return None
+
+  # Documents
+
+  def did_open(self, params):
+    document = params["textDocument"]
+    self.update_document(uri_to_path(document["uri"]), document["text"])
+
+  def did_change(self, params):
+    # Documents are synchronized in full, the last change has the whole content
+    self.update_document(uri_to_path(params["textDocument"]["uri"]), params["contentChanges"][-1]["text"])
+
+  def did_close(self, params):
+    path = uri_to_path(params["textDocument"]["uri"])
+    self.documents.pop(path, None)
+    self.file_changed(path)
+    self.publish_diagnostics(path, [])
+
+  def update_document(self, path, text):
+    self.documents[path] = text
+    locale = self.locale_of(path)
+    if locale is not None:
+      self.publish_diagnostics(path, self.locale_diagnostics(locale, text))
+    elif self.is_source_file(path):
+      self.index_file(path)
+      self.publish_diagnostics(path, self.source_diagnostics(text))
+
+  def did_change_watched_files(self, params):
+    for change in params["changes"]:
+      path = uri_to_path(change["uri"])
+      if change["type"] == FILE_DELETED and path not in self.documents and self.locale_of(path) is None:
+        self.usages.pop(path, None)
+      else:
+        self.file_changed(path)
+
+  def file_changed(self, path):
+    locale = self.locale_of(path)
+    if locale is not None:
+      if locale not in self.corpus.localeFiles or not os.path.isfile(path):
+        # A new or removed locale, the corpus lists the locale files when it is created
+        self.corpus = LocaleCorpus(self.dict_dir, self.dict_file_name)
+      else:
+        self.corpus.reload(locale)
+      if locale == MASTER_LOCALE:
+        # The tokens changed, so any literal of any file may now be a token or no longer be one
+        self.index_sources()
+      self.republish_diagnostics()
+    elif self.is_source_file(path):
+      if os.path.isfile(path) or path in self.documents:
+        self.index_file(path)
+      else:
+        self.usages.pop(path, None)
+
+  # Queries
+
+  def token_at(self, params):
+    path = uri_to_path(params["textDocument"]["uri"])
+    line = line_at(self.content(path), params["position"]["line"])
+    column = column_of(line, params["position"]["character"])
+    for match in WORD_PATTERN.finditer(line):
+      if match.start() <= column <= match.end() and match.group() in self.keys():
+        return match.group()
+    return None
+
+  def completion(self, params):
+    path = uri_to_path(params["textDocument"]["uri"])
+    line = line_at(self.content(path), params["position"]["line"])
+    literal = OPEN_LITERAL_PATTERN.search(line[:column_of(line, params["position"]["character"])])
+    if literal is None:
+      return []
+    prefix = literal.group(2)
+    return [
+      {"label": key, "kind": COMPLETION_ITEM_KIND_CONSTANT, "detail": value}
+      for key, value in self.keys().items() if key.startswith(prefix)
+    ]
+
+  def hover(self, params):
+    token = self.token_at(params)
+    if token is None:
+      return None
+    lines = [f"**{token}**", "", "| Locale | Translation |", "| --- | --- |"]
+    for locale in sorted(self.corpus.localeNames(), key=lambda name: (name != MASTER_LOCALE, name)):
+      value = (self.corpus.locale(locale) or {}).get(token)
+      if value is not None:
+        escaped = value.replace("|", "\\|").replace("\n", "<br>")
+        lines.append(f"| {locale} | {escaped} |")
+    return {"contents": {"kind": "markdown", "value": "\n".join(lines)}}
+
+  def references(self, params):
+    token = self.token_at(params)
+    if token is None:
+      return []
+    locations = []
+    for path, usages in sorted(self.usages.items()):
+      if token not in usages:
+        continue
+      content = self.content(path)
+      line_starts = line_starts_of(content)
+      for start, end in usages[token]:
+        locations.append({"uri": path_to_uri(path), "range": to_range(content, start, end, line_starts)})
+    return locations
+
+  # Diagnostics
+
+  def source_diagnostics(self, content):
+    """
+    Returns:
+      list: An error for every token of an i18n call site that is not an en key.
+    """
+    keys = self.keys()
+    diagnostics = []
+    line_starts = line_starts_of(content)
+    for match in TOKEN_CALL_SITE_PATTERN.finditer(content):
+      if match.group(2) not in keys:
+        diagnostics.append({
+          "range": to_range(content, match.start(2), match.end(2), line_starts),
+          "severity": DIAGNOSTIC_ERROR,
+          "source": "localization",
+          "message": f"Unknown localization token: {match.group(2)}",
+        })
+    return diagnostics
+
+  def locale_diagnostics(self, locale, content):
+    """
+    Returns:
+      list: A warning for every key of the locale file whose dynamic variables differ from en, and for every key that
+        en does not have.
+    """
+    if locale == MASTER_LOCALE:
+      return []
+    try:
+      data = loadsJson(content)
+    except ValueError:
+      # The document is being edited
+      return []
+    master_variables = self.corpus.variables(MASTER_LOCALE)
+    locale_variables, _ = extractVariablesFromDict(data)
+    diagnostics = []
+    line_starts = line_starts_of(content)
+    for match in LOCALE_KEY_PATTERN.finditer(content):
+      key = match.group(1)
+      if key not in locale_variables:
+        continue
+      if key not in master_variables:
+        message = f"{key} is not an en key"
+      else:
+        missing = missingFromList(master_variables[key], locale_variables[key])
+        additional = missingFromList(locale_variables[key], master_variables[key])
+        if not missing and not additional:
+          continue
+        message = ", ".join(
+          part for part in (
+            f"missing variables: {', '.join(sorted(missing))}" if missing else "",
+            f"additional variables: {', '.join(sorted(additional))}" if additional else "",
+          ) if part
+        )
+      diagnostics.append({
+        "range": to_range(content, match.start(1), match.end(1), line_starts),
+        "severity": DIAGNOSTIC_WARNING,
+        "source": "localization",
+        "message": message,
+      })
+    return diagnostics
+
+  def republish_diagnostics(self):
+    for path, content in self.documents.items():
+      locale = self.locale_of(path)
+      if locale is not None:
+        self.publish_diagnostics(path, self.locale_diagnostics(locale, content))
+      elif self.is_source_file(path):
+        self.publish_diagnostics(path, self.source_diagnostics(content))
+
+  def publish_diagnostics(self, path, diagnostics):
+    send({"jsonrpc": "2.0", "method": "textDocument/publishDiagnostics",
+          "params": {"uri": path_to_uri(path), "diagnostics": diagnostics}})
+
+  # Messages
+
+  def handle(self, message):
+    method = message.get("method")
+    params = message.get("params") or {}
+    if "id" not in message:
+      if method == "exit":
+        sys.exit(0 if self.shutdown_requested else 1)
+      handler = self.notification_handlers.get(method)
+      if handler is None:
+        return
+      try:
+        handler(params)
+      except Exception:
+        # A notification has no response, the server drops it and keeps serving the other messages
+        console.warn(f"Dropped a {method} notification that failed:\n{traceback.format_exc()}")
+      return
+
+    handler = self.handlers.get(method)
+    if handler is None:
+      send({"jsonrpc": "2.0", "id": message["id"],
+            "error": {"code": METHOD_NOT_FOUND, "message": f"Unsupported method: {method}"}})
+      return
+    try:
+      result = handler(params)
+    except (KeyError, TypeError) as error:
+      send({"jsonrpc": "2.0", "id": message["id"],
+            "error": {"code": INVALID_PARAMS, "message": f"Invalid parameters for {method}: {error}"}})
+      return
+    except Exception as error:
+      console.warn(f"The {method} request failed:\n{traceback.format_exc()}")
+      send({"jsonrpc": "2.0", "id": message["id"],
+            "error": {"code": INTERNAL_ERROR, "message": f"{method} failed: {error}"}})
+      return
+    send({"jsonrpc": "2.0", "id": message["id"], "result": result})
+
+
+def send(message):
+  body = dumpsJson(message).encode("utf-8")
+  protocol_output.write(f"Content-Length: {len(body)}\r\n\r\n".encode("ascii") + body)
+  protocol_output.flush()
+
+
+def read_message(stream):
+  """
+  Returns:
+    dict: The next message of the stream, or None at the end of the stream.
+  """
+  content_length = None
+  while True:
+    header = stream.readline()
+    if not header:
+      return None
+    header = header.strip()
+    if not header:
+      break
+    name, _, value = header.decode("ascii").partition(":")
+    if name.lower() == "content-length":
+      content_length = int(value)
+  if content_length is None:
+    raise ValueError("A message has no Content-Length header")
+  return loadsJson(stream.read(content_length))
+
+
+def main():
+  args = parser.parse_args()
+
+  # Before anything is printed, so that the protocol stream only has messages
+  sys.stdout = sys.stderr
+
+  if args.debug:
+    console.enableDebug()
+
+  server = LocalizationServer(args.dict_dir, args.dict_file_name)
+  while True:
+    message = read_message(sys.stdin.buffer)
+    if message is None:
+      break
+    server.handle(message)
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,165 @@
+import hashlib
+import random
+import re
+import os
+import sys
+
+# This allows for importing from the localization and util directories NOTE: Auto importing tools will also prepend the import paths with "tools." this will not work and needs to be removed from import paths
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from localization.dynamicVariables import DYNAMIC_VARIABLE_PATTERN
+from localization.localeCorpus import PLURAL_PREFIX, parsePluralForms
+
+TAG_PATTERN = re.compile(r"<[^>]*>")
+PUNCTUATION_PATTERN = re.compile(r"[^\w\s]")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+SHINGLE_SIZE = 4
+NUM_PERMUTATIONS = 128
+ROWS_PER_BAND = 4
+# A Mersenne prime larger than any shingle hash
+MINHASH_PRIME = (1 << 61) - 1
+MINHASH_SEED = 1
+
+
+def normalizeString(value):
+  """
+  Normalizes a string for comparison: the dynamic variables, formatting tags and punctuation are removed and the
+  whitespace and case are folded. Plural strings are compared on their "other" form.
+
+  Args:
+    value (str): The string to normalize.
+
+  Returns:
+    str: The normalized string, which can be empty.
+  """
+  if value.startswith(PLURAL_PREFIX):
+    forms = dict(parsePluralForms(value))
+    value = forms.get("other", next(iter(forms.values()), ""))
+  value = re.sub(DYNAMIC_VARIABLE_PATTERN, " ", value)
+  value = TAG_PATTERN.sub(" ", value)
+  value = PUNCTUATION_PATTERN.sub(" ", value.lower())
+  return WHITESPACE_PATTERN.sub(" ", value).strip()
+
+
+def shingles(value, size=SHINGLE_SIZE):
+  """
+  Returns:
+    set: The character n-grams of the string, or the string itself if it is shorter than n.
+  """
+  if len(value) <= size:
+    return {value}
+  return {value[i:i + size] for i in range(len(value) - size + 1)}
+
+
+def jaccard(a, b):
+  return len(a & b) / len(a | b)
+
+
+class MinHasher:
+  """
+  Computes MinHash signatures: for each of the permutations h(x) = (a * x + b) mod p, the minimum over the hashes of the
+  shingles of a string. The probability that two signatures agree at a position is the Jaccard similarity of the
+  shingle sets. The permutations are seeded so results are reproducible across runs.
+  """
+
+  def __init__(self, numPermutations=NUM_PERMUTATIONS, seed=MINHASH_SEED):
+    generator = random.Random(seed)
+    self.permutations = [
+      (generator.randrange(1, MINHASH_PRIME), generator.randrange(0, MINHASH_PRIME)) for _ in range(numPermutations)
+    ]
+
+  def signature(self, shingleSet):
+    hashes = [int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little")
+              for shingle in shingleSet]
+    return tuple(min((a * x + b) % MINHASH_PRIME for x in hashes) for a, b in self.permutations)
+
+
+def lshCandidatePairs(signatures, rowsPerBand=ROWS_PER_BAND):
+  """
+  Finds the pairs of items whose signatures are identical in at least one band. Each item is bucketed once per band,
+  so the cost is linear in the number of items plus the number of candidate pairs.
+
+  Args:
+    signatures (dict): A dictionary mapping each item to its MinHash signature.
+    rowsPerBand (int): The number of signature positions per band. Fewer rows find less similar pairs.
+
+  Returns:
+    set: The candidate pairs, as (item, item) tuples sorted within each pair.
+  """
+  pairs = set()
+  numPermutations = len(next(iter(signatures.values()), ()))
+  for start in range(0, numPermutations, rowsPerBand):
+    buckets = dict()
+    for item, signature in signatures.items():
+      buckets.setdefault(signature[start:start + rowsPerBand], []).append(item)
+    for bucket in buckets.values():
+      for i, first in enumerate(bucket):
+        for second in bucket[i + 1:]:
+          pairs.add((first, second) if first < second else (second, first))
+  return pairs
+
+
+def findNearDuplicates(strings, threshold=0.8, shingleSize=SHINGLE_SIZE, numPermutations=NUM_PERMUTATIONS,
+                       rowsPerBand=ROWS_PER_BAND):
+  """
+  Clusters the keys whose normalized strings are identical or nearly identical. Keys with identical normalized strings
+  are grouped by hashing, the distinct normalized strings are then paired with MinHash/LSH and each candidate pair is
+  confirmed with its exact Jaccard similarity.
+
+  Args:
+    strings (dict): A dictionary mapping each key to its string.
+    threshold (float): The minimum Jaccard similarity of the shingles of two near-duplicate strings.
+    shingleSize (int): The length of the character n-grams compared.
+    numPermutations (int): The length of the MinHash signatures.
+    rowsPerBand (int): The number of signature positions per LSH band.
+
+  Returns:
+    list: The clusters of at least two keys, each a dict with its "keys" (in the order of the strings), whether it
+      only contains "exact" duplicates and the lowest "similarity" of the pairs that joined it. Largest clusters first.
+  """
+  keysByNormalized = dict()
+  for key, value in strings.items():
+    normalized = normalizeString(value)
+    if normalized:
+      keysByNormalized.setdefault(normalized, []).append(key)
+
+  shingleSets = {normalized: shingles(normalized, shingleSize) for normalized in keysByNormalized}
+  hasher = MinHasher(numPermutations)
+  signatures = {normalized: hasher.signature(shingleSet) for normalized, shingleSet in shingleSets.items()}
+
+  # Union-find over the distinct normalized strings
+  parents = {normalized: normalized for normalized in keysByNormalized}
+  similarities = dict()
+
+  def find(item):
+    while parents[item] != item:
+      parents[item] = parents[parents[item]]
+      item = parents[item]
+    return item
+
+  for first, second in lshCandidatePairs(signatures, rowsPerBand):
+    similarity = jaccard(shingleSets[first], shingleSets[second])
+    if similarity < threshold:
+      continue
+    rootFirst, rootSecond = find(first), find(second)
+    root = min(rootFirst, rootSecond)
+    similarities[root] = min(similarity, similarities.get(rootFirst, 1.0), similarities.get(rootSecond, 1.0))
+    parents[rootFirst] = parents[rootSecond] = root
+
+  groups = dict()
+  for normalized in keysByNormalized:
+    groups.setdefault(find(normalized), []).append(normalized)
+
+  order = {key: index for index, key in enumerate(strings)}
+  clusters = []
+  for root, members in groups.items():
+    keys = sorted((key for normalized in members for key in keysByNormalized[normalized]), key=order.get)
+    if len(keys) < 2:
+      continue
+    clusters.append({
+      "keys": keys,
+      "exact": len(members) == 1,
+      "similarity": similarities.get(root, 1.0),
+    })
+  clusters.sort(key=lambda cluster: (-len(cluster["keys"]), order[cluster["keys"][0]]))
+  return clusters
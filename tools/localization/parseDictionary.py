@@ -1,50 +1,194 @@
-import json
-
 import os
+import re
+import sys
 import xml.etree.ElementTree as ET
 
+# This allows for importing from the localization and util directories NOTE: Auto importing tools will also prepend the import paths with "tools." this will not work and needs to be removed from import paths
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from util.jsonUtils import loadJson
+
+# Maps a file extension to the function parsing that format, see register_parser
+PARSERS = {}
+
+
+def register_parser(extension, parser):
+    """
+    Registers the parser used by parse_dictionary for files with the given extension.
+
+    Args:
+      extension (str): The file extension, including the leading dot (e.g. ".json").
+      parser (function): A function taking a file path and returning a dictionary of key-value pairs, or None if the
+        file does not exist.
+    """
+    PARSERS[extension] = parser
+
 
 def parse_json(file_path):
     if not os.path.exists(file_path):
         return None
-    with open(file_path, encoding='utf-8') as file:
-        data = json.load(file)
-    return data
+    return loadJson(file_path)
+
+
+ANDROID_ESCAPE_PATTERN = re.compile(r"\\(u[0-9a-fA-F]{4}|.)", re.DOTALL)
+ANDROID_ESCAPES = {"n": "\n", "t": "\t"}
+
+
+def unescape_android(value):
+    """
+    Resolves the escaping used in Android string resources: surrounding double quotes, backslash escapes and unicode
+    escapes (e.g. \\' \\" \\n \\u2019).
+    """
+    if value is None:
+        return ""
+    value = value.strip()
+    if len(value) >= 2 and value.startswith('"') and value.endswith('"'):
+        value = value[1:-1]
+
+    def replace(match):
+        escaped = match.group(1)
+        if escaped.startswith("u") and len(escaped) == 5:
+            return chr(int(escaped[1:], 16))
+        return ANDROID_ESCAPES.get(escaped, escaped)
+
+    return ANDROID_ESCAPE_PATTERN.sub(replace, value)
+
+
+def inner_xml(element):
+    """
+    Returns the content of an element, keeping any formatting tags (e.g. <b>) nested in it. The parser has already
+    unescaped the entities (e.g. &amp;), so the nested tags are written back as is rather than serialized, which would
+    escape them again.
+    """
+    content = element.text or ""
+    for child in element:
+        attributes = "".join(f' {name}="{value}"' for name, value in child.attrib.items())
+        inner = inner_xml(child)
+        if inner:
+            content += f"<{child.tag}{attributes}>{inner}</{child.tag}>"
+        else:
+            content += f"<{child.tag}{attributes}/>"
+        content += child.tail or ""
+    return content
 
 
 def parse_xml(file_path):
+    """
+    Parses an Android string resource file. The file is streamed with iterparse and every top-level element is
+    cleared once read, so memory use is bounded by the largest entry rather than the size of the file.
+
+    <string> entries map to their value, <plurals> entries are converted to the same
+    "{count, plural, one [...] other [...]}" format used by the JSON locales and every <item> of a <string-array>
+    maps to "name[index]".
+    """
     if not os.path.exists(file_path):
         return None
-    tree = ET.parse(file_path)
-    root = tree.getroot()
     data = {}
-    for child in root:
-        key = child.attrib["name"]
-        value = child.text
-        data[key] = value
+    depth = 0
+    root = None
+    for event, element in ET.iterparse(file_path, events=("start", "end")):
+        if event == "start":
+            if root is None:
+                root = element
+            depth += 1
+            continue
+
+        depth -= 1
+        # Only the direct children of <resources> are entries, anything deeper is read with its parent
+        if depth != 1:
+            continue
+
+        key = element.attrib.get("name")
+        if key is not None:
+            if element.tag == "string":
+                data[key] = unescape_android(inner_xml(element))
+            elif element.tag == "plurals":
+                forms = " ".join(
+                    f"{item.attrib['quantity']} [{unescape_android(inner_xml(item))}]" for item in element.iter("item")
+                )
+                data[key] = f"{{count, plural, {forms}}}"
+            elif element.tag == "string-array":
+                for index, item in enumerate(element.iter("item")):
+                    data[f"{key}[{index}]"] = unescape_android(inner_xml(item))
+
+        element.clear()
+        root.clear()
     return data
 
 
+STRINGS_STATEMENT_PATTERN = re.compile(
+    r"""
+    (?:\s|/\*.*?\*/|//[^\n]*\n)*              # whitespace and comments, one character of whitespace at a time so
+                                              # that there is a single way to match them
+    ("[^"\\]*(?:\\.[^"\\]*)*"|[^\s=;"/]+)\s*  # quoted or unquoted key
+    =\s*
+    "([^"\\]*(?:\\.[^"\\]*)*)"\s*             # quoted value
+    ;
+    """,
+    re.DOTALL | re.VERBOSE,
+)
+STRINGS_TRAILING_PATTERN = re.compile(r"(?:\s|/\*.*?\*/|//[^\n]*(?:\n|$))*", re.DOTALL)
+STRINGS_ESCAPE_PATTERN = re.compile(r"\\(U[0-9a-fA-F]{4}|u[0-9a-fA-F]{4}|.)", re.DOTALL)
+STRINGS_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "0": "\0"}
+STRINGS_CHUNK_SIZE = 64 * 1024
+
+
+def unescape_strings(value):
+    """
+    Resolves the escaping used in iOS .strings files (e.g. \\" \\n \\U2019).
+    """
+    if "\\" not in value:
+        return value
+
+    def replace(match):
+        escaped = match.group(1)
+        if len(escaped) == 5:
+            return chr(int(escaped[1:], 16))
+        return STRINGS_ESCAPES.get(escaped, escaped)
+
+    return STRINGS_ESCAPE_PATTERN.sub(replace, value)
+
+
 def parse_strings(file_path):
+    """
+    Parses an iOS .strings file of "key" = "value"; statements. Comments, multi-line values and escaped quotes are
+    supported. The file is read in chunks and only the current unfinished statement is buffered, so memory use is
+    bounded by the largest statement rather than the size of the file.
+    """
     if not os.path.exists(file_path):
         return None
     data = {}
+    buffer = ""
     with open(file_path, encoding='utf-8') as file:
-        for line in file:
-            if "=" in line:
-                key, value = line.strip().split("=")
-                key = key.strip().strip('"')
-                value = value.strip().strip(";").strip('"')
-                data[key] = value
+        while True:
+            chunk = file.read(STRINGS_CHUNK_SIZE)
+            buffer += chunk
+            position = 0
+            while True:
+                match = STRINGS_STATEMENT_PATTERN.match(buffer, position)
+                if not match:
+                    # The statement is either incomplete and continues in the next chunk, or invalid
+                    break
+                key, value = match.groups()
+                if key.startswith('"'):
+                    key = unescape_strings(key[1:-1])
+                data[key] = unescape_strings(value)
+                position = match.end()
+            buffer = buffer[position:]
+            if not chunk:
+                break
+
+    if STRINGS_TRAILING_PATTERN.fullmatch(buffer) is None:
+        raise ValueError(f"Invalid statement in {file_path}: {buffer.strip()[:40]}")
     return data
 
 
+register_parser(".json", parse_json)
+register_parser(".xml", parse_xml)
+register_parser(".strings", parse_strings)
+
+
 def parse_dictionary(file_path):
-    if file_path.endswith(".json"):
-        return parse_json(file_path)
-    elif file_path.endswith(".xml"):
-        return parse_xml(file_path)
-    elif file_path.endswith(".strings"):
-        return parse_strings(file_path)
-    else:
-        raise ValueError("Unsupported file format")
+    for extension, parser in PARSERS.items():
+        if file_path.endswith(extension):
+            return parser(file_path)
+    raise ValueError("Unsupported file format")
@@ -0,0 +1,65 @@
+#!/bin/python3
+import argparse
+import os
+import sys
+
+# This allows for importing from the localization and util directories NOTE: Auto importing tools will also prepend the import paths with "tools." this will not work and needs to be removed from import paths
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from localization.issueIndex import IssueIndex, ISSUE_TYPES, crowdinLink
+from util.jsonUtils import loadJson
+from util.logger import console
+
+parser = argparse.ArgumentParser(
+  description="Query the problems found by generateLocales.py, e.g. every locale with a problem on a key."
+)
+parser.add_argument("--key", type=str, help="Only the problems of this key")
+parser.add_argument("--locale", type=str, help="Only the problems of this locale (e.g. fr or zh_CN)")
+parser.add_argument(
+  "--issue-type",
+  action="append",
+  choices=ISSUE_TYPES,
+  help="Only the problems of this issue type. Can be passed several times",
+)
+parser.add_argument(
+  "--include-tag-differences",
+  action="store_true",
+  help="Also include the tag findings that are not problems (a locale with more tags than en)",
+)
+parser.add_argument("--locales-only", action="store_true", help="Only print the locales with a matching problem")
+parser.add_argument("--links", action="store_true", help="Print the Crowdin link of every matching problem")
+parser.add_argument(
+  "--problems-file",
+  default="./tools/localization/output/problems.json",
+  help="The problems file written by generateLocales.py --write-problems",
+)
+
+args = parser.parse_args()
+
+if not os.path.exists(args.problems_file):
+  console.warn(
+    f"{args.problems_file} does not exist, run generateLocales.py with --write-problems (or --problems-file) first")
+  sys.exit(1)
+
+issue_index = IssueIndex.fromProblems(loadJson(args.problems_file))
+
+findings = list(issue_index.query(args.key, args.locale, args.issue_type, not args.include_tag_differences))
+
+if args.locales_only:
+  locales = []
+  for _, locale, _, _ in findings:
+    if locale not in locales:
+      locales.append(locale)
+  for locale in locales:
+    print(locale)
+else:
+  for key, locale, issue_type, value in findings:
+    if args.links:
+      print(f"- [{key}]({crowdinLink(key, locale)})")
+      continue
+    detail = "" if value is True else f" | {', '.join(value) if isinstance(value, list) else value}"
+    print(f"{key:<50} | {locale:<6} | {issue_type}{detail}")
+
+console.info(
+  f"Found {len(findings)} problems in {len({locale for _, locale, _, _ in findings})} locales "
+  f"for {len({key for key, _, _, _ in findings})} keys")
@@ -1,7 +1,17 @@
+import math
+import os
 import re
+import sys
+import time
+
+# This allows for importing from the localization and util directories NOTE: Auto importing tools will also prepend the import paths with "tools." this will not work and needs to be removed from import paths
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from util.fileUtils import writeFile
+from util.jsonUtils import dumpsJson, loadJson
 
 
 # The regex statements are designed to shortcut so are ordered from most common to least common. The advanced cases will also detect the same result as the simple cases. This is fine.
+# RegexStats measures whether that order still holds and reorders the patterns by their measured hits per second.
 def get_localization_regex_list(string):
   key = re.escape(string)
   # Regex is ordered from most common to least common
@@ -31,3 +41,157 @@ def localization_regex_as_list(string):
     )
 
   return regex_compiled_list
+
+
+# The pattern templates identify each pattern independently of the key, so statistics can be shared between keys and runs
+PATTERN_TEMPLATES = get_localization_regex_list("__key__")
+
+# Patterns whose cost grows faster than this power of the file size are flagged as superlinear
+SUPERLINEAR_EXPONENT = 1.5
+# The minimum number of misses needed before estimating how the cost of a pattern scales
+SUPERLINEAR_MIN_SAMPLES = 100
+
+
+class RegexStats:
+  """
+  Records how often each localization pattern matches and how long it takes, so the patterns can be tried in order of
+  measured hits per second instead of the hand-written order. The statistics are persisted between runs.
+
+  For every miss the cost is also recorded against the size of the searched content, fitting log(time) against
+  log(size), to estimate the exponent of how the cost of a pattern scales with the file size.
+  """
+
+  def __init__(self):
+    self.patterns = {
+      template: {"calls": 0, "hits": 0, "time": 0.0, "worst": 0.0, "n": 0, "x": 0.0, "y": 0.0, "xx": 0.0, "xy": 0.0}
+      for template in PATTERN_TEMPLATES
+    }
+    self.order = list(range(len(PATTERN_TEMPLATES)))
+
+  @classmethod
+  def load(cls, file_path):
+    """
+    Loads the statistics of previous runs, if any, and orders the patterns by their measured hits per second.
+    Statistics of patterns that no longer exist are discarded.
+    """
+    stats = cls()
+    if os.path.exists(file_path):
+      saved = loadJson(file_path)
+      for template, pattern_stats in saved.items():
+        if template in stats.patterns:
+          stats.patterns[template].update(pattern_stats)
+      stats.order = stats.measured_order()
+    return stats
+
+  def save(self, file_path):
+    writeFile(file_path, dumpsJson(self.patterns, indent=2))
+
+  def merge(self, patterns):
+    """
+    Adds the statistics recorded by another RegexStats, e.g. in a worker process.
+
+    Args:
+      patterns (dict): The patterns attribute of the other RegexStats.
+    """
+    for template, pattern_stats in patterns.items():
+      current = self.patterns[template]
+      for name, value in pattern_stats.items():
+        current[name] = max(current[name], value) if name == "worst" else current[name] + value
+
+  def measured_order(self):
+    """
+    Returns:
+      list: The pattern indexes ordered by hits per second. Patterns that were never tried keep their hand-written
+      position relative to each other, after the measured ones.
+    """
+
+    def score(index):
+      pattern_stats = self.patterns[PATTERN_TEMPLATES[index]]
+      if pattern_stats["calls"] == 0:
+        return (1, 0, index)
+      return (0, -pattern_stats["hits"] / max(pattern_stats["time"], 1e-9), index)
+
+    return sorted(range(len(PATTERN_TEMPLATES)), key=score)
+
+  def compile(self, string):
+    """
+    Returns:
+      list: The (index, compiled pattern) pairs for the string, in the current order.
+    """
+    regex_list = localization_regex_as_list(string)
+    return [(index, regex_list[index]) for index in self.order]
+
+  def search(self, indexed_regex_list, content):
+    """
+    Searches the content with each pattern until one matches, recording the hits and time of every pattern tried.
+
+    Args:
+      indexed_regex_list (list): The patterns as returned by compile.
+      content (str): The content to search.
+
+    Returns:
+      bool: True if any pattern matched.
+    """
+    size = len(content)
+    for index, regex in indexed_regex_list:
+      start = time.perf_counter()
+      found = regex.search(content) is not None
+      elapsed = time.perf_counter() - start
+
+      pattern_stats = self.patterns[PATTERN_TEMPLATES[index]]
+      pattern_stats["calls"] += 1
+      pattern_stats["time"] += elapsed
+      if found:
+        pattern_stats["hits"] += 1
+        return True
+
+      if elapsed > pattern_stats["worst"]:
+        pattern_stats["worst"] = elapsed
+      if size > 0 and elapsed > 0:
+        x, y = math.log(size), math.log(elapsed)
+        pattern_stats["n"] += 1
+        pattern_stats["x"] += x
+        pattern_stats["y"] += y
+        pattern_stats["xx"] += x * x
+        pattern_stats["xy"] += x * y
+    return False
+
+  def size_exponent(self, template):
+    """
+    Returns:
+      float: The estimated exponent of the cost of a miss as a function of the content size (1 is linear), or None
+      if there are not enough samples.
+    """
+    pattern_stats = self.patterns[template]
+    n = pattern_stats["n"]
+    if n < SUPERLINEAR_MIN_SAMPLES:
+      return None
+    variance = n * pattern_stats["xx"] - pattern_stats["x"] ** 2
+    if variance <= 0:
+      return None
+    return (n * pattern_stats["xy"] - pattern_stats["x"] * pattern_stats["y"]) / variance
+
+  def superlinear_patterns(self):
+    """
+    Returns:
+      list: The templates of the patterns whose cost grows superlinearly with the content size.
+    """
+    return [
+      template for template in PATTERN_TEMPLATES
+      if (self.size_exponent(template) or 0) > SUPERLINEAR_EXPONENT
+    ]
+
+  def print_table(self):
+    """
+    Prints the statistics of each pattern in the current order.
+    """
+    print(f"{'Hits':>8} {'Calls':>9} {'Time (s)':>10} {'Worst (ms)':>11} {'Exponent':>9}  Pattern")
+    for index in self.order:
+      template = PATTERN_TEMPLATES[index]
+      pattern_stats = self.patterns[template]
+      exponent = self.size_exponent(template)
+      flag = " (superlinear)" if (exponent or 0) > SUPERLINEAR_EXPONENT else ""
+      print(
+        f"{pattern_stats['hits']:>8} {pattern_stats['calls']:>9} {pattern_stats['time']:>10.4f} "
+        f"{pattern_stats['worst'] * 1000:>11.3f} {'-' if exponent is None else f'{exponent:.2f}':>9}  {template}{flag}"
+      )
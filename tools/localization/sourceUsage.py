@@ -0,0 +1,298 @@
+import mmap
+import os
+import queue
+import re
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# This allows for importing from the localization and util directories NOTE: Auto importing tools will also prepend the import paths with "tools." this will not work and needs to be removed from import paths
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from localization.regex import localization_regex_as_list
+from util.fileDiscovery import discoverFiles
+from util.logger import console
+
+files_to_ignore = [
+  "./ts/localization/locales.ts",
+  "./ts/localization/locales.critical.ts",
+  "./ts/localization/locales.deferred.ts",
+]
+ignore_patterns = [re.compile(re.escape(pattern)) for pattern in files_to_ignore]
+
+# Matches a token literal at an i18n call site:
+#   window.i18n('token'), i18n.stripped('token'), window?.i18n?.('token'), <Localizer token="token" />, token={'token'}
+#   and the props of the Localizer component: { token: 'token' } or { token: 'token', args: ... }. A props object only
+#   has the token, args, asTag and className properties, other objects with a token property are not matched. Tokens
+#   built at runtime (e.g. template literals) are not literals and are not matched.
+TOKEN_CALL_SITE_PATTERN = re.compile(
+  r"""
+  (?:
+    \bi18n(?:\?\.)?(?:\.(?:stripped|inEnglish|getRawMessage))?\s*\(\s*
+    |\{\s*token\s*:\s*(?=['"]\w+['"]\s*(?:\}|,\s*(?:\}|(?:args|asTag|className)\b)))
+    |\btoken=\{?\s*
+  )
+  (['"])(\w+)\1
+  """,
+  re.VERBOSE,
+)
+
+
+# Matches any single-word string literal, quoted with ', " or `
+STRING_LITERAL_PATTERN = re.compile(r"""(['"`])(\w+)\1""")
+
+
+def should_ignore_file(path):
+  return any(pattern.search(path) for pattern in ignore_patterns)
+
+
+SOURCE_DIRS = ["./ts/"]
+SOURCE_EXTENSIONS = (".ts", ".tsx")
+SOURCE_FILES_CACHE = "./tools/localization/output/source_files.json"
+
+
+def find_source_files(use_cache=True):
+  """
+  Args:
+    use_cache (bool): Reuse the file list of a previous run if no source directory changed since.
+
+  Returns:
+    list: The sorted paths of every source file that can reference a localized string. The order is stable so results
+    are reproducible across runs and shards.
+  """
+  files = discoverFiles(SOURCE_DIRS, SOURCE_EXTENSIONS, cacheFile=SOURCE_FILES_CACHE if use_cache else None)
+  # The preload scripts of each window live at the root of the repository
+  with os.scandir("./") as entries:
+    files.extend(entry.path for entry in entries if entry.is_file() and entry.name.endswith("preload.js"))
+  return sorted(file_path for file_path in files if not should_ignore_file(file_path))
+
+
+# Files of at least this size are memory-mapped and decoded in place instead of being read into an intermediate buffer
+MMAP_THRESHOLD = 1024 * 1024
+DEFAULT_MEMORY_BUDGET = 256 * 1024 * 1024
+DEFAULT_READ_WORKERS = 4
+
+
+def load_file(file_path):
+  console.debug(f"Loading {file_path} into memory")
+  if os.path.getsize(file_path) >= MMAP_THRESHOLD:
+    with open(file_path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+      # Normalise the line endings the same way as reading in text mode
+      return str(mapped, "utf-8").replace("\r\n", "\n").replace("\r", "\n")
+  with open(file_path, "r", encoding="utf-8") as file:
+    return file.read()
+
+
+class SourceFilePipeline:
+  """
+  Loads source files on a thread pool while the caller scans the files that are already loaded. The total size of the
+  files that are loaded but not yet released is capped by a byte budget, so memory use stays bounded however large the
+  source tree is. A file larger than the budget is still loaded on its own.
+
+  Files are yielded as (index, path, content) in the order they finish loading, where index is the position of the file
+  in the given list. With auto_release a file is released when the next one is requested, otherwise release must be
+  called once the file has been processed.
+  """
+
+  def __init__(self, files, memory_budget=DEFAULT_MEMORY_BUDGET, read_workers=DEFAULT_READ_WORKERS, auto_release=True):
+    self.files = list(files)
+    self.memory_budget = memory_budget
+    self.read_workers = read_workers
+    self.auto_release = auto_release
+    self._sizes = [os.path.getsize(file_path) for file_path in self.files]
+    self._used = 0
+    self._closed = False
+    self._condition = threading.Condition()
+    self._loaded = queue.Queue()
+
+  def release(self, index):
+    with self._condition:
+      self._used -= self._sizes[index]
+      self._condition.notify_all()
+
+  def _load(self, index):
+    try:
+      self._loaded.put((index, load_file(self.files[index]), None))
+    except Exception as error:
+      self._loaded.put((index, None, error))
+
+  def _schedule(self, executor):
+    for index, size in enumerate(self._sizes):
+      with self._condition:
+        self._condition.wait_for(
+          lambda: self._closed or self._used == 0 or self._used + size <= self.memory_budget
+        )
+        if self._closed:
+          return
+        self._used += size
+      executor.submit(self._load, index)
+
+  def __iter__(self):
+    self._closed = False
+    with ThreadPoolExecutor(max_workers=self.read_workers) as executor:
+      scheduler = threading.Thread(target=self._schedule, args=(executor,), daemon=True)
+      scheduler.start()
+      previous = None
+      try:
+        for _ in range(len(self.files)):
+          if previous is not None:
+            self.release(previous)
+            previous = None
+          index, content, error = self._loaded.get()
+          if error is not None:
+            raise error
+          if self.auto_release:
+            previous = index
+          yield index, self.files[index], content
+        if previous is not None:
+          self.release(previous)
+      finally:
+        # Stop scheduling reads if the caller stopped early or a file failed to load
+        with self._condition:
+          self._closed = True
+          self._condition.notify_all()
+        scheduler.join()
+
+
+def search_string_in_regex_list(regex_list, file_content):
+  return any(matcher.search(file_content) for matcher in regex_list)
+
+
+def findUsedKeys(keys, files=None):
+  """
+  Finds which of the given keys are referenced in the source code.
+
+  Args:
+    keys (iterable): The keys to search for.
+    files (iterable): The source files to search. Defaults to find_source_files().
+
+  Returns:
+    set: The keys that were found in at least one file.
+  """
+  regex_lists = {key: localization_regex_as_list(key) for key in keys}
+  found = set()
+  # Each file is searched for the keys that were not found yet as soon as it is loaded
+  for _, _, file_content in SourceFilePipeline(files if files is not None else find_source_files()):
+    found.update(
+      key for key, regex_list in regex_lists.items()
+      if key not in found and search_string_in_regex_list(regex_list, file_content)
+    )
+  return found
+
+
+def findReferencedKeys(keys, files=None):
+  """
+  Finds which of the given keys appear as a string literal anywhere in the source code. This is a superset of
+  findUsedKeys (a key passed through a variable or a lookup table is still referenced by its literal), so it is safe to
+  drop the keys it does not return. Tokens built at runtime (e.g. `prefix${name}`) are not found.
+
+  Args:
+    keys (iterable): The keys to search for.
+    files (iterable): The source files to search. Defaults to find_source_files().
+
+  Returns:
+    set: The keys that were found in at least one file.
+  """
+  keys = set(keys)
+  found = set()
+  for _, _, file_content in SourceFilePipeline(files if files is not None else find_source_files()):
+    found.update(match.group(2) for match in STRING_LITERAL_PATTERN.finditer(file_content))
+  return keys.intersection(found)
+
+
+# Matches the relative module of a static import or export, or of a require call. Type-only imports are erased from the
+# compiled code and dynamic imports are loaded on demand, so neither is matched.
+IMPORT_PATTERN = re.compile(
+  r"""
+  (?:^|;)\s*(?:import|export)(?!\s+type\b)[^;'"]*?(['"])(\.{1,2}/[^'"\n]+)\1
+  |\brequire\s*\(\s*(['"])(\.{1,2}/[^'"\n]+)\3
+  """,
+  re.MULTILINE | re.VERBOSE,
+)
+MODULE_SUFFIXES = ("", ".ts", ".tsx", ".js", ".jsx", "/index.ts", "/index.tsx", "/index.js")
+
+
+def find_reachable_files(entries, depth=None, files=None):
+  """
+  Follows the relative imports of the entry files to find the source files they load.
+
+  Args:
+    entries (iterable): The paths of the entry files.
+    depth (int): The maximum number of imports to follow from an entry file, None to follow every import.
+    files (iterable): The source files that can be reached. Defaults to find_source_files().
+
+  Returns:
+    list: The sorted paths of the entry files and of every file reachable from them.
+  """
+  source_files = {
+    os.path.normpath(file_path): file_path for file_path in (files if files is not None else find_source_files())
+  }
+
+  def resolve(importer, module):
+    base = os.path.normpath(os.path.join(os.path.dirname(importer), module))
+    return next((base + suffix for suffix in MODULE_SUFFIXES if base + suffix in source_files), None)
+
+  reachable = set()
+  for entry in entries:
+    entry = os.path.normpath(entry)
+    if entry not in source_files:
+      raise ValueError(f"The entry file {entry} is not a source file")
+    reachable.add(entry)
+  frontier = list(reachable)
+  level = 0
+  while frontier and (depth is None or level < depth):
+    level += 1
+    imported = []
+    for file_path in frontier:
+      for match in IMPORT_PATTERN.finditer(load_file(source_files[file_path])):
+        module_path = resolve(file_path, match.group(2) or match.group(4))
+        if module_path is not None and module_path not in reachable:
+          reachable.add(module_path)
+          imported.append(module_path)
+    frontier = imported
+  return sorted(source_files[file_path] for file_path in reachable)
+
+
+def extract_call_site_tokens(file_path, file_content):
+  """
+  Extracts every token literal used at an i18n call site of a file.
+
+  Args:
+    file_path (str): The path of the file, used for the locations.
+    file_content (str): The content of the file.
+
+  Returns:
+    dict: A dictionary mapping each token to the list of its locations ("path:line").
+  """
+  tokens = dict()
+  line_number = 1
+  line_position = 0
+  for match in TOKEN_CALL_SITE_PATTERN.finditer(file_content):
+    line_number += file_content.count("\n", line_position, match.start())
+    line_position = match.start()
+    tokens.setdefault(match.group(2), []).append(f"{file_path}:{line_number}")
+  return tokens
+
+
+def find_component_call_sites(entries, files=None):
+  """
+  Finds the token literals at the i18n call sites of the components the entry files can render: the entry files and
+  every component (.tsx) file reached from them through component imports, however many imports away.
+
+  Args:
+    entries (iterable): The paths of the entry files.
+    files (iterable): The source files that can be reached. Defaults to find_source_files().
+
+  Returns:
+    dict: A dictionary mapping each token to the list of its locations ("path:line").
+  """
+  entries = list(entries)
+  entry_paths = {os.path.normpath(entry) for entry in entries}
+  components = [
+    file_path for file_path in (files if files is not None else find_source_files())
+    if file_path.endswith(".tsx") or os.path.normpath(file_path) in entry_paths
+  ]
+  tokens = dict()
+  for file_path in find_reachable_files(entries, None, components):
+    for token, locations in extract_call_site_tokens(file_path, load_file(file_path)).items():
+      tokens.setdefault(token, []).extend(locations)
+  return tokens
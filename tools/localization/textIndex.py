@@ -0,0 +1,191 @@
+import hashlib
+import os
+import pickle
+import sys
+
+# This allows for importing from the localization and util directories NOTE: Auto importing tools will also prepend the import paths with "tools." this will not work and needs to be removed from import paths
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from localization.localeCorpus import MASTER_LOCALE
+from util.fileUtils import openAtomically
+from util.logger import console
+
+TEXT_INDEX_FILE = "./tools/localization/output/text_index.pickle"
+TEXT_INDEX_VERSION = 1
+GRAM_SIZE = 3
+
+
+def grams(text):
+  """
+  Returns:
+    set: The trigrams of the case-folded text. The text is padded with spaces so that strings shorter than a trigram and
+    the start and end of words are indexed too.
+  """
+  padded = f" {text.casefold()} "
+  return {padded[i:i + GRAM_SIZE] for i in range(len(padded) - GRAM_SIZE + 1)}
+
+
+def fileStamp(filePath):
+  stat = os.stat(filePath)
+  return stat.st_mtime_ns, stat.st_size
+
+
+def fileHash(filePath):
+  with open(filePath, "rb") as file:
+    return hashlib.sha1(file.read()).hexdigest()
+
+
+class LocaleSegment:
+  """
+  The index of a single locale file: its keys and values, and a posting list of value positions for every trigram.
+  """
+
+  def __init__(self, filePath, stamp, contentHash, dictionary):
+    self.filePath = filePath
+    self.stamp = stamp
+    self.contentHash = contentHash
+    self.keys = list(dictionary.keys())
+    self.values = list(dictionary.values())
+    self.gramCounts = []
+    self.postings = dict()
+    for position, value in enumerate(self.values):
+      valueGrams = grams(value)
+      self.gramCounts.append(len(valueGrams))
+      for gram in valueGrams:
+        self.postings.setdefault(gram, []).append(position)
+
+
+class TextIndex:
+  """
+  A persisted trigram index over every value of every locale, for finding keys from their displayed text. The index is
+  split into one segment per locale file and only the segments of the files that changed since the index was saved are
+  rebuilt.
+  """
+
+  def __init__(self, indexFile=TEXT_INDEX_FILE):
+    self.indexFile = indexFile
+    self.segments = dict()
+
+  @classmethod
+  def load(cls, corpus, indexFile=TEXT_INDEX_FILE):
+    """
+    Loads the index and brings it up to date with the locale files of the corpus, saving it if anything changed.
+
+    Args:
+      corpus (LocaleCorpus): The locales to index. Only the locale files that changed are parsed.
+      indexFile (str): The file the index is persisted in.
+
+    Returns:
+      TextIndex: The up to date index.
+    """
+    index = cls(indexFile)
+    if os.path.exists(indexFile):
+      try:
+        with open(indexFile, "rb") as file:
+          saved = pickle.load(file)
+        if saved.get("version") == TEXT_INDEX_VERSION:
+          index.segments = saved["segments"]
+      except (pickle.UnpicklingError, EOFError, AttributeError, ImportError, KeyError):
+        console.warn(f"Ignoring the unreadable text index {indexFile}")
+    if index.update(corpus):
+      index.save()
+    return index
+
+  def update(self, corpus):
+    """
+    Rebuilds the segments of the locale files that changed, were added or removed.
+
+    Returns:
+      bool: Whether any segment changed.
+    """
+    changed = False
+    localeNames = corpus.localeNames()
+    for locale in list(self.segments):
+      if locale not in localeNames:
+        del self.segments[locale]
+        changed = True
+
+    for locale in localeNames:
+      filePath = corpus.filePath(locale)
+      stamp = fileStamp(filePath)
+      segment = self.segments.get(locale)
+      if segment is not None and segment.filePath == filePath and segment.stamp == stamp:
+        continue
+      # The file was touched, only re-index it if its content changed
+      contentHash = fileHash(filePath)
+      if segment is not None and segment.filePath == filePath and segment.contentHash == contentHash:
+        segment.stamp = stamp
+      else:
+        console.debug(f"Indexing {filePath}")
+        self.segments[locale] = LocaleSegment(filePath, stamp, contentHash, corpus.locale(locale))
+      changed = True
+    return changed
+
+  def save(self):
+    with openAtomically(self.indexFile, "wb") as file:
+      pickle.dump({"version": TEXT_INDEX_VERSION, "segments": self.segments}, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+  def _segments(self, locales):
+    # en first, as it is the string the other locales translate
+    return sorted(
+      ((locale, segment) for locale, segment in self.segments.items() if locales is None or locale in locales),
+      key=lambda item: item[0] != MASTER_LOCALE,
+    )
+
+  def search(self, text, locales=None, limit=None):
+    """
+    Finds the values containing the text, ignoring case.
+
+    Args:
+      text (str): The text to search for.
+      locales (iterable): Only search these locales. Defaults to every locale.
+      limit (int): The maximum number of results.
+
+    Returns:
+      list: (key, locale, value) tuples.
+    """
+    folded = text.casefold()
+    # Only the grams entirely inside the text, the padded ones at its ends would require a word boundary
+    queryGrams = {folded[i:i + GRAM_SIZE] for i in range(len(folded) - GRAM_SIZE + 1)}
+    results = []
+    for locale, segment in self._segments(locales):
+      if queryGrams:
+        postings = sorted((segment.postings.get(gram, []) for gram in queryGrams), key=len)
+        candidates = set(postings[0]).intersection(*postings[1:])
+      else:
+        candidates = range(len(segment.values))
+      for position in sorted(candidates):
+        # The trigrams only select candidates, the text must still appear as a whole
+        if folded in segment.values[position].casefold():
+          results.append((segment.keys[position], locale, segment.values[position]))
+          if limit and len(results) >= limit:
+            return results
+    return results
+
+  def fuzzySearch(self, text, locales=None, limit=20, minScore=0.5):
+    """
+    Finds the values sharing the most trigrams with the text, tolerating typos and small differences.
+
+    Args:
+      text (str): The text to search for.
+      locales (iterable): Only search these locales. Defaults to every locale.
+      limit (int): The maximum number of results.
+      minScore (float): The minimum share of the trigrams of the text that a value must contain.
+
+    Returns:
+      list: (key, locale, value, score) tuples, best matches first. The score is the share of the trigrams of the text
+        found in the value, ties are broken by the similarity of the whole value.
+    """
+    queryGrams = grams(text)
+    results = []
+    for locale, segment in self._segments(locales):
+      shared = dict()
+      for gram in queryGrams:
+        for position in segment.postings.get(gram, []):
+          shared[position] = shared.get(position, 0) + 1
+      for position, count in shared.items():
+        score = count / len(queryGrams)
+        if score >= minScore:
+          similarity = count / (len(queryGrams) + segment.gramCounts[position] - count)
+          results.append((score, similarity, segment.keys[position], locale, segment.values[position]))
+    results.sort(key=lambda result: (-result[0], -result[1], result[2], result[3]))
+    return [(key, locale, value, score) for score, _, key, locale, value in results[:limit]]
@@ -0,0 +1,236 @@
+import os
+import re
+import sys
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+# This allows for importing from the localization and util directories NOTE: Auto importing tools will also prepend the import paths with "tools." this will not work and needs to be removed from import paths
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from util.fileUtils import writeFile
+from util.jsonUtils import dumpsJson, loadJson
+from util.logger import console
+
+# Directories that never contain source files, pruned even when they are not listed in a .gitignore
+DEFAULT_IGNORED_DIRS = frozenset({".git", "node_modules", "release", "dist", "coverage", "__pycache__"})
+DEFAULT_WORKERS = 8
+IGNORE_FILE_NAME = ".gitignore"
+CACHE_VERSION = 1
+
+
+def translateGlob(pattern):
+    """
+    Translates a .gitignore glob into a regex. Unlike fnmatch, * and ? never match a /.
+    """
+    regex = ""
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            regex += "(?:.*/)?"
+            i += 3
+        elif pattern.startswith("**", i):
+            regex += ".*"
+            i += 2
+        elif pattern[i] == "*":
+            regex += "[^/]*"
+            i += 1
+        elif pattern[i] == "?":
+            regex += "[^/]"
+            i += 1
+        elif pattern[i] == "[" and "]" in pattern[i + (3 if pattern.startswith("[!", i) else 2):]:
+            # Only a leading ! negates the class, and a ] right after the opening (or the !) is a literal
+            negated = pattern.startswith("[!", i)
+            start = i + 2 if negated else i + 1
+            end = pattern.index("]", start + 1)
+            regex += "[" + ("^" if negated else "") + pattern[start:end] + "]"
+            i = end + 1
+        else:
+            regex += re.escape(pattern[i])
+            i += 1
+    return regex
+
+
+class IgnoreRules:
+    """
+    The rules of a single .gitignore file. Supports comments, negation (!), directory-only rules (trailing /), rules
+    anchored to the directory of the file (containing a /) and the *, ? and ** wildcards.
+    """
+
+    def __init__(self, baseDir, lines):
+        self.baseDir = baseDir
+        self.rules = []
+        for line in lines:
+            line = line.rstrip("\n").rstrip()
+            if not line or line.startswith("#"):
+                continue
+            negated = line.startswith("!")
+            if negated:
+                line = line[1:]
+            directoryOnly = line.endswith("/")
+            line = line.rstrip("/")
+            anchored = "/" in line
+            pattern = translateGlob(line.lstrip("/"))
+            if not anchored:
+                # An unanchored rule matches the name at any depth
+                pattern = r"(?:.*/)?" + pattern
+            self.rules.append((re.compile(pattern), negated, directoryOnly))
+
+    @classmethod
+    def load(cls, baseDir):
+        """
+        Returns:
+          IgnoreRules: The rules of the .gitignore file in the directory, or None if it has none.
+        """
+        filePath = os.path.join(baseDir, IGNORE_FILE_NAME)
+        if not os.path.isfile(filePath):
+            return None
+        with open(filePath, "r", encoding="utf-8") as file:
+            return cls(baseDir, file.readlines())
+
+    def match(self, path, isDir):
+        """
+        Returns:
+          bool: True if the path is ignored, False if it is explicitly not ignored, None if no rule matches it.
+        """
+        relativePath = os.path.relpath(path, self.baseDir).replace(os.sep, "/")
+        result = None
+        for regex, negated, directoryOnly in self.rules:
+            if directoryOnly and not isDir:
+                continue
+            if regex.fullmatch(relativePath):
+                result = not negated
+        return result
+
+
+def isIgnored(rulesStack, path, isDir):
+    # The deepest .gitignore with a matching rule decides
+    for rules in reversed(rulesStack):
+        result = rules.match(path, isDir)
+        if result is not None:
+            return result
+    return False
+
+
+def ancestorRules(root):
+    """
+    Returns:
+      list: The rules of every .gitignore between the current working directory and the root, outermost first.
+    """
+    current = os.path.abspath(".")
+    target = os.path.abspath(root)
+    if target == current or os.path.commonpath([current, target]) != current:
+        return []
+    parts = os.path.relpath(target, current).split(os.sep)
+    # The .gitignore of the root itself is read when it is scanned
+    ancestors = [current] + [os.path.join(current, *parts[:i]) for i in range(1, len(parts))]
+    return [rules for rules in map(IgnoreRules.load, ancestors) if rules is not None]
+
+
+def scanDirectory(dirPath, rulesStack, extensions, ignoredDirs):
+    """
+    Lists one directory, pruning ignored sub-directories and keeping the files with a matching extension.
+
+    Returns:
+      tuple: The directory path, its mtime, the path of its .gitignore (or None), the rules stack of its children, the
+        matching files and the sub-directories to descend into.
+    """
+    mtime = os.stat(dirPath).st_mtime_ns
+    rules = IgnoreRules.load(dirPath)
+    if rules is not None:
+        rulesStack = rulesStack + [rules]
+    files = []
+    subDirs = []
+    with os.scandir(dirPath) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in ignoredDirs and not isIgnored(rulesStack, entry.path, True):
+                    subDirs.append(entry.path)
+            elif os.path.splitext(entry.name)[1] in extensions and not isIgnored(rulesStack, entry.path, False):
+                files.append(entry.path)
+    ignoreFile = os.path.join(dirPath, IGNORE_FILE_NAME) if rules is not None else None
+    return dirPath, mtime, ignoreFile, rulesStack, files, subDirs
+
+
+def cacheKey(roots, extensions, ignoredDirs):
+    return {
+        "version": CACHE_VERSION,
+        "roots": list(roots),
+        "extensions": sorted(extensions),
+        "ignoredDirs": sorted(ignoredDirs),
+    }
+
+
+def loadCachedFiles(cacheFile, key):
+    """
+    Returns:
+      list: The cached file list, or None if there is no cache or any directory or .gitignore changed since it was written.
+    """
+    if not os.path.isfile(cacheFile):
+        return None
+    try:
+        cache = loadJson(cacheFile)
+    except ValueError:
+        return None
+    if cache.get("key") != key:
+        return None
+    # Adding, removing or renaming an entry updates the mtime of its directory, so unchanged mtimes mean the same files
+    for path, mtime in {**cache["directories"], **cache["ignoreFiles"]}.items():
+        try:
+            if os.stat(path).st_mtime_ns != mtime:
+                return None
+        except OSError:
+            return None
+    return cache["files"]
+
+
+def discoverFiles(roots, extensions, ignoredDirs=DEFAULT_IGNORED_DIRS, cacheFile=None, workers=DEFAULT_WORKERS):
+    """
+    Finds every file with one of the given extensions under the root directories. Directories are listed in parallel
+    and the ignored ones (ignoredDirs and .gitignore entries) are pruned before they are descended into.
+
+    Args:
+      roots (list): The directories to search.
+      extensions (iterable): The file extensions to keep, including the leading dot (e.g. ".ts").
+      ignoredDirs (iterable): Directory names to always prune.
+      cacheFile (str): A file to cache the result in. The cache is reused while the mtime of every directory visited
+        and every .gitignore read is unchanged.
+      workers (int): The number of directories listed at once.
+
+    Returns:
+      list: The sorted paths of the files found.
+    """
+    extensions = frozenset(extensions)
+    ignoredDirs = frozenset(ignoredDirs)
+    key = cacheKey(roots, extensions, ignoredDirs)
+    if cacheFile is not None:
+        cached = loadCachedFiles(cacheFile, key)
+        if cached is not None:
+            console.debug(f"Using the cached file list from {cacheFile}")
+            return cached
+
+    files = []
+    directories = dict()
+    ignoreFiles = dict()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = {executor.submit(scanDirectory, root, ancestorRules(root), extensions, ignoredDirs) for root in roots}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                dirPath, mtime, ignoreFile, rulesStack, dirFiles, subDirs = future.result()
+                directories[dirPath] = mtime
+                if ignoreFile is not None:
+                    ignoreFiles[ignoreFile] = os.stat(ignoreFile).st_mtime_ns
+                files.extend(dirFiles)
+                pending.update(
+                    executor.submit(scanDirectory, subDir, rulesStack, extensions, ignoredDirs) for subDir in subDirs
+                )
+
+    files.sort()
+    if cacheFile is not None:
+        for stack in (ancestorRules(root) for root in roots):
+            for rules in stack:
+                ignoreFile = os.path.join(rules.baseDir, IGNORE_FILE_NAME)
+                ignoreFiles[ignoreFile] = os.stat(ignoreFile).st_mtime_ns
+        writeFile(cacheFile, dumpsJson(
+            {"key": key, "directories": directories, "ignoreFiles": ignoreFiles, "files": files}, indent=2
+        ))
+    return files
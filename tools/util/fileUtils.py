@@ -1,6 +1,9 @@
+import contextlib
 import json
 import os
+import shutil
 import sys
+import tempfile
 
 
 # This allows for importing from the localization and util directories NOTE: Auto importing tools will also prepend the import paths with "tools." this will not work and needs to be removed from import paths
@@ -78,6 +81,59 @@ def writeFile(filePath, data):
         file.write(data)
 
 
+@contextlib.contextmanager
+def openAtomically(filePath, mode="w"):
+    """
+    This function opens a temporary file next to a file, which replaces the file once the block completes, so an
+    interrupted write never leaves a truncated file behind. Each write has its own temporary file, so tools writing the
+    same file at the same time never write into each other's and the last one to complete wins. The temporary file is
+    removed if the block raises. Creating its parent directories if they do not exist.
+
+    Args:
+      filePath (str): The path to the file to write.
+      mode (str): "w" to write text as utf-8, or "wb" to write bytes.
+
+    Returns:
+      The temporary file, opened for writing.
+    """
+    makeDirIfNotExists(filePath)
+    directory, name = os.path.split(filePath)
+    temporaryFile = tempfile.NamedTemporaryFile(
+        mode,
+        encoding=None if "b" in mode else "utf-8",
+        dir=directory or ".",
+        prefix=f"{name}.",
+        suffix=".tmp",
+        delete=False,
+    )
+    try:
+        with temporaryFile as file:
+            yield file
+        # The temporary file is only readable by its owner, the file keeps the permissions it would have otherwise
+        if os.path.exists(filePath):
+            shutil.copymode(filePath, temporaryFile.name)
+        else:
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(temporaryFile.name, 0o666 & ~umask)
+        os.replace(temporaryFile.name, filePath)
+    except BaseException:
+        removeFileIfExists(temporaryFile.name)
+        raise
+
+
+def writeFileAtomically(filePath, data):
+    """
+    This function writes data to a file through a temporary file that replaces it once complete, see openAtomically.
+
+    Args:
+      filePath (str): The path to the file to write the data to.
+      data (str): The data to write to the file.
+    """
+    with openAtomically(filePath) as file:
+        file.write(data)
+
+
 def removeFileIfExists(filePath):
     """
     This function removes a file if it exists.
@@ -0,0 +1,53 @@
+import subprocess
+
+
+def runGit(*gitArgs):
+    """
+    Runs a git command in the current working directory and returns its output.
+
+    Args:
+      gitArgs (str): The arguments to pass to git.
+
+    Returns:
+      str: The standard output of the command.
+
+    Raises:
+      RuntimeError: If the git command fails.
+    """
+    result = subprocess.run(["git", *gitArgs], capture_output=True, text=True, encoding="utf-8")
+    if result.returncode != 0:
+        raise RuntimeError(f"git {' '.join(gitArgs)} failed: {result.stderr.strip()}")
+    return result.stdout
+
+
+def changedFiles(ref, pathspec):
+    """
+    Lists the files that differ between a git ref and the working tree, including untracked files.
+
+    Args:
+      ref (str): The git ref to compare against, e.g. "origin/main".
+      pathspec (str): The pathspec to restrict the comparison to.
+
+    Returns:
+      list: The changed file paths, relative to the current working directory.
+    """
+    tracked = runGit("diff", "--name-only", "--relative", ref, "--", pathspec).splitlines()
+    untracked = runGit("ls-files", "--others", "--exclude-standard", "--", pathspec).splitlines()
+    return tracked + [path for path in untracked if path not in tracked]
+
+
+def showFile(ref, path):
+    """
+    Returns the content of a file at a git ref.
+
+    Args:
+      ref (str): The git ref to read the file from.
+      path (str): The file path, relative to the current working directory.
+
+    Returns:
+      str: The content of the file, or None if the file does not exist at that ref.
+    """
+    try:
+        return runGit("show", f"{ref}:./{path}")
+    except RuntimeError:
+        return None
@@ -0,0 +1,100 @@
+import json
+import math
+import re
+
+# orjson is much faster than the json module at parsing and serializing the locale files, but it is optional: every
+# function falls back to the json module when it is not installed, or when it cannot produce the same output
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+LEADING_SPACES_PATTERN = re.compile(rb"^( +)", re.MULTILINE)
+# orjson writes exponents without the zero padding of the json module (1e-7 rather than 1e-07)
+EXPONENT_PATTERN = re.compile(rb"[0-9]e[-+]?[0-9]")
+
+
+def loadsJson(data):
+    """
+    Parses a JSON document.
+
+    Args:
+      data (str | bytes): The JSON document.
+
+    Returns:
+      The parsed data, identical to json.loads.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # Let the json module parse what orjson rejects (e.g. integers over 64 bits) or raise its usual error
+            pass
+    return json.loads(data)
+
+
+def loadJson(filePath):
+    """
+    Parses a JSON file.
+
+    Args:
+      filePath (str): The path to the JSON file.
+
+    Returns:
+      The parsed data, identical to json.load.
+    """
+    with open(filePath, "rb") as file:
+        return loadsJson(file.read())
+
+
+def reindent(data, indent):
+    # orjson only indents with 2 spaces. Its strings never contain a raw newline, so the leading spaces of every line are
+    # the indentation alone and can be scaled to any indent
+    if indent == 2:
+        return data
+    return LEADING_SPACES_PATTERN.sub(lambda match: b" " * (len(match.group(1)) // 2 * indent), data)
+
+
+def hasNonFiniteFloat(data):
+    # orjson writes NaN and the infinities as null, where the json module writes NaN, Infinity and -Infinity
+    if isinstance(data, float):
+        return not math.isfinite(data)
+    if isinstance(data, dict):
+        return any(hasNonFiniteFloat(value) for value in data.values())
+    if isinstance(data, (list, tuple)):
+        return any(hasNonFiniteFloat(value) for value in data)
+    return False
+
+
+def dumpsJson(data, indent=None, sortKeys=False, ensureAscii=True):
+    """
+    Serializes data to a JSON document, byte for byte identical to json.dumps with the same arguments.
+
+    Args:
+      data: The data to serialize.
+      indent (int): The number of spaces of each indentation level, None for a single line.
+      sortKeys (bool): Whether to sort the keys of the objects.
+      ensureAscii (bool): Whether to escape the non-ASCII characters.
+
+    Returns:
+      str: The JSON document.
+    """
+    # A single line is formatted with different separators by orjson, so it is left to the json module
+    if orjson is not None and indent:
+        options = orjson.OPT_INDENT_2 | (orjson.OPT_SORT_KEYS if sortKeys else 0)
+        try:
+            output = orjson.dumps(data, option=options)
+        except orjson.JSONEncodeError:
+            # orjson is stricter than the json module, e.g. with non-string keys
+            output = None
+        # orjson never escapes non-ASCII characters, the json module has to when there are any
+        if (
+            output is not None
+            and (not ensureAscii or output.isascii())
+            and not EXPONENT_PATTERN.search(output)
+            and not (b"null" in output and hasNonFiniteFloat(data))
+        ):
+            return reindent(output, indent).decode("utf-8")
+    return json.dumps(data, indent=indent, sort_keys=sortKeys, ensure_ascii=ensureAscii)
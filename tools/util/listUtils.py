@@ -9,7 +9,8 @@ def missingFromList(list1, list2):
     Returns:
       list: A new list containing the elements that are present in list1 but not in list2.
     """
-    return [item for item in set(list1) if item not in set(list2)]
+    set2 = set(list2)
+    return [item for item in set(list1) if item not in set2]
 
 
 def missingFromSet(set1, set2):
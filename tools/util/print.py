@@ -1,5 +1,10 @@
-import json
+import os
+import sys
+
+# This allows for importing from the localization and util directories NOTE: Auto importing tools will also prepend the import paths with "tools." this will not work and needs to be removed from import paths
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from util.jsonUtils import dumpsJson
 
 
 def print_json(data, sort_keys=False):
-    print(json.dumps(data, sort_keys=sort_keys, indent=2))
+    print(dumpsJson(data, indent=2, sortKeys=sort_keys))
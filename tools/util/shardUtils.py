@@ -0,0 +1,87 @@
+import argparse
+import glob
+import os
+import re
+
+
+def parseShard(value):
+    """
+    Parses a shard argument of the form "i/n" where i is the 1-based index of the shard and n the number of shards.
+    This is meant to be used as an argparse type.
+
+    Args:
+      value (str): The shard argument, e.g. "2/4".
+
+    Returns:
+      tuple: A tuple of the shard index and the number of shards.
+    """
+    match = re.fullmatch(r"(\d+)/(\d+)", value)
+    if not match:
+        raise argparse.ArgumentTypeError(f"Invalid shard '{value}', expected i/n (e.g. 1/4)")
+    index, count = int(match.group(1)), int(match.group(2))
+    if count < 1 or index < 1 or index > count:
+        raise argparse.ArgumentTypeError(f"Invalid shard '{value}', expected 1 <= i <= n")
+    return index, count
+
+
+def selectShard(items, shard):
+    """
+    Returns the items that belong to a shard. Items are sorted before being distributed round-robin so every node
+    computes the same partition regardless of the order the items were listed in.
+
+    Args:
+      items (iterable): The items to partition.
+      shard (tuple): The shard index and number of shards as returned by parseShard.
+
+    Returns:
+      set: The items belonging to the shard.
+    """
+    index, count = shard
+    return set(sorted(items)[index - 1::count])
+
+
+def shardFilePath(filePath, shard):
+    """
+    Returns the path of the partial result file written by a shard, e.g. "problems.json" becomes
+    "problems.shard-2-of-4.json".
+
+    Args:
+      filePath (str): The path of the merged result file.
+      shard (tuple): The shard index and number of shards as returned by parseShard.
+    """
+    root, ext = os.path.splitext(filePath)
+    index, count = shard
+    return f"{root}.shard-{index}-of-{count}{ext}"
+
+
+def findShardFiles(filePath):
+    """
+    Finds the partial result files written by every shard for a merged result file.
+
+    Args:
+      filePath (str): The path of the merged result file.
+
+    Returns:
+      list: The partial result file paths ordered by shard index.
+
+    Raises:
+      ValueError: If no partial files were found, they disagree on the number of shards or a shard is missing.
+    """
+    root, ext = os.path.splitext(filePath)
+    pattern = re.compile(re.escape(root) + r"\.shard-(\d+)-of-(\d+)" + re.escape(ext) + "$")
+    shards = {}
+    for path in glob.glob(f"{glob.escape(root)}.shard-*-of-*{glob.escape(ext)}"):
+        match = pattern.match(path)
+        if match:
+            shards[(int(match.group(1)), int(match.group(2)))] = path
+
+    if not shards:
+        raise ValueError(f"No shard files found for {filePath}")
+    counts = {count for _, count in shards}
+    if len(counts) != 1:
+        raise ValueError(f"Shard files for {filePath} disagree on the number of shards: {sorted(counts)}")
+    count = counts.pop()
+    missing = [index for index in range(1, count + 1) if (index, count) not in shards]
+    if missing:
+        raise ValueError(f"Missing shard files for {filePath}: {', '.join(f'{i}/{count}' for i in missing)}")
+    return [shards[(index, count)] for index in range(1, count + 1)]
@@ -1,38 +1,128 @@
 #!/bin/python3
-import json
 import argparse
+import glob
+import multiprocessing
+import os
+import sys
 
+# This allows for importing from the localization and util directories NOTE: Auto importing tools will also prepend the import paths with "tools." this will not work and needs to be removed from import paths
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from util.jsonUtils import dumpsJson, loadsJson
 
-# Create the parser
-parser = argparse.ArgumentParser(description="Sort a JSON file.")
+# The formatting conventions of the locale files
+INDENT = 2
 
-# Add the arguments
-parser.add_argument(
-    "InputFile", metavar="inputfile", type=str, help="the input JSON file"
-)
-parser.add_argument(
-    "-o",
-    metavar="outputfile",
-    type=str,
-    nargs="?",
-    default="",
-    help="the output JSON file (optional)",
-)
 
-# Parse the arguments
-args = parser.parse_args()
+def formatJson(data, trailing=""):
+    """
+    Formats data using the project's formatting conventions: sorted keys, an indent of INDENT and unescaped non-ASCII
+    characters.
 
-INPUT_FILE = args.InputFile
-OUTPUT_FILE = args.o if args.o else INPUT_FILE
+    Args:
+      data (dict): The data to format.
+      trailing (str): The whitespace to append after the JSON document.
 
-# Load the JSON data from the input file
-with open(INPUT_FILE, "r") as f:
-    data = json.load(f)
+    Returns:
+      str: The formatted JSON document.
+    """
+    return dumpsJson(data, indent=INDENT, sortKeys=True, ensureAscii=False) + trailing
 
-# Sort the JSON data
-sorted_data = json.dumps(data, sort_keys=True, indent=2)
 
-with open(OUTPUT_FILE, "w") as f:
-    f.write(sorted_data)
+def sortJson(inputFile, outputFile, check=False):
+    """
+    Sorts the keys of a JSON file using the project's formatting conventions. Any whitespace after the JSON document is
+    preserved and the output file is only written when its content would change.
 
-print(f"Sorted JSON data written to {OUTPUT_FILE}")
+    Args:
+      inputFile (str): The JSON file to sort.
+      outputFile (str): The file to write the sorted JSON to.
+      check (bool): Only check whether the file is sorted, without writing anything.
+
+    Returns:
+      bool: True if the output file already had the sorted content, False if it was (or, with check, would be) written.
+    """
+    with open(inputFile, "r", encoding="utf-8") as f:
+        raw = f.read()
+
+    trailing = raw[len(raw.rstrip()):]
+    sorted_data = formatJson(loadsJson(raw), trailing)
+
+    current = raw
+    if outputFile != inputFile:
+        current = None
+        if os.path.exists(outputFile):
+            with open(outputFile, "r", encoding="utf-8") as f:
+                current = f.read()
+
+    if current == sorted_data:
+        return True
+
+    if not check:
+        with open(outputFile, "w", encoding="utf-8") as f:
+            f.write(sorted_data)
+    return False
+
+
+def sortJsonInPlace(inputFile, check=False):
+    return inputFile, sortJson(inputFile, inputFile, check)
+
+
+if __name__ == "__main__":
+    # Create the parser
+    parser = argparse.ArgumentParser(description="Sort a JSON file, or every locale file in a directory.")
+
+    # Add the arguments
+    parser.add_argument(
+        "InputFile", metavar="inputfile", type=str, help="the input JSON file, or a directory such as ./_locales"
+    )
+    parser.add_argument(
+        "-o",
+        metavar="outputfile",
+        type=str,
+        nargs="?",
+        default="",
+        help="the output JSON file (optional, only for a single file)",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Only report the files that are not sorted and exit with an error if there are any",
+    )
+    parser.add_argument(
+        "--file-name",
+        type=str,
+        default="messages.json",
+        help="The name of the JSON files to sort when the input is a directory",
+    )
+    parser.add_argument(
+        "--disable-concurrency",
+        action="store_true",
+        help="Sort the files of a directory one at a time",
+    )
+
+    # Parse the arguments
+    args = parser.parse_args()
+
+    INPUT_FILE = args.InputFile
+
+    if os.path.isdir(INPUT_FILE):
+        if args.o:
+            parser.error("-o can only be used with a single input file")
+        files = sorted(glob.glob(os.path.join(glob.escape(INPUT_FILE), "**", args.file_name), recursive=True))
+        if args.disable_concurrency:
+            results = [sortJsonInPlace(file, args.check) for file in files]
+        else:
+            with multiprocessing.Pool() as pool:
+                results = pool.starmap(sortJsonInPlace, [(file, args.check) for file in files])
+    else:
+        OUTPUT_FILE = args.o if args.o else INPUT_FILE
+        results = [(OUTPUT_FILE, sortJson(INPUT_FILE, OUTPUT_FILE, args.check))]
+
+    unsorted_files = [file for file, is_sorted in results if not is_sorted]
+    for file in unsorted_files:
+        print(f"{file} is not sorted" if args.check else f"Sorted JSON data written to {file}")
+
+    print(f"{len(results) - len(unsorted_files)}/{len(results)} files already sorted")
+
+    if args.check and unsorted_files:
+        sys.exit(1)
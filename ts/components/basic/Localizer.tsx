@@ -2,6 +2,7 @@ import styled from 'styled-components';
 import { SessionHtmlRenderer } from './SessionHTMLRenderer';
 import {
   GetMessageArgs,
+  hasFormattingTags,
   LocalizerComponentProps,
   MergedLocalizerTokens,
   sanitizeArgs,
@@ -10,15 +11,6 @@ import { getCrowdinLocale } from '../../util/i18n/shared';
 
 /** An array of supported html tags to render if found in a string */
 export const supportedFormattingTags = ['b', 'i', 'u', 's', 'br', 'span'];
-/** NOTE: self-closing tags must also be listed in {@link supportedFormattingTags} */
-const supportedSelfClosingFormattingTags = ['br'];
-
-function createSupportedFormattingTagsRegex() {
-  return new RegExp(
-    `<(?:${supportedFormattingTags.join('|')})>.*?</(?:${supportedFormattingTags.join('|')})>|<(?:${supportedSelfClosingFormattingTags.join('|')})\\/>`,
-    'g'
-  );
-}
 
 const StyledHtmlRenderer = styled.span`
   * > span {
@@ -43,7 +35,8 @@ export const Localizer = <T extends MergedLocalizerTokens>(props: LocalizerCompo
     ...([props.token, args] as GetMessageArgs<T>)
   );
 
-  const containsFormattingTags = createSupportedFormattingTagsRegex().test(rawString);
+  /** The tags of every string are found by the generator of the dictionaries, see {@link hasFormattingTags} */
+  const containsFormattingTags = hasFormattingTags(getCrowdinLocale(), props.token, args);
   const cleanArgs = args && containsFormattingTags ? sanitizeArgs(args) : args;
 
   const i18nString = window.i18n.formatMessageWithArgs(
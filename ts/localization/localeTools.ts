@@ -178,15 +178,9 @@ export function getMessageDefault<T extends MergedLocalizerTokens>(
  * @returns The localized message string with substitutions applied. Any HTML and custom tags are removed.
  */
 export const stripped: I18nMethods['stripped'] = (...[token, args]) => {
-  const sanitizedArgs = args ? sanitizeArgs(args, '\u200B') : undefined;
-
   // Note: the `as any` is needed because we don't have the <T> template argument available
   // when enforcing the type of the stripped function to be the one defined by I18nMethods
-  const i18nString = getMessageDefault(...([token, sanitizedArgs] as GetMessageArgs<any>));
-
-  const strippedString = i18nString.replaceAll(/<[^>]*>/g, '');
-
-  return deSanitizeHtmlTags(strippedString, '\u200B');
+  return localizeFromOld(token, args as any).strip().toString();
 };
 
 export const strippedWithObj: I18nMethods['strippedWithObj'] = opts => {
@@ -301,6 +295,79 @@ function getStringForRule({
   return cardinalRule in dictForLocale ? ((dictForLocale as any)[cardinalRule] as string) : token;
 }
 
+/**
+ * The start and end of every formatting tag of a string, flattened: `[start, end, start, end, ...]`.
+ * The generator finds the tags of every string, so they are not parsed at runtime.
+ */
+type TagRanges = ReadonlyArray<number>;
+
+/** The `tags` of a dictionary entry are only generated for the locales whose string has tags */
+type SimpleTags = Partial<Record<CrowdinLocale, TagRanges>>;
+type PluralTags = Partial<Record<CrowdinLocale, Partial<Record<Intl.LDMLPluralRule, TagRanges>>>>;
+
+function getSimpleTagRanges(token: SimpleLocalizerTokens, crowdinLocale: CrowdinLocale) {
+  const { tags } = simpleDictionary[token] as unknown as { tags?: SimpleTags };
+  return tags?.[crowdinLocale];
+}
+
+function getPluralTagRanges(
+  token: PluralLocalizerTokens,
+  crowdinLocale: CrowdinLocale,
+  cardinalRule: Intl.LDMLPluralRule
+) {
+  const { tags } = pluralsDictionary[token] as unknown as { tags?: PluralTags };
+  return tags?.[crowdinLocale]?.[cardinalRule];
+}
+
+/**
+ * Removes the formatting tags of a string
+ * @param str The string from the dictionary, before its dynamic variables are substituted
+ * @param tagRanges The tag ranges generated for the string, if it has any tags
+ * @returns The string without its tags
+ */
+function stripTags(str: string, tagRanges?: TagRanges): string {
+  if (!tagRanges) {
+    return str;
+  }
+  let strippedString = '';
+  let position = 0;
+  for (let i = 0; i < tagRanges.length; i += 2) {
+    strippedString += str.slice(position, tagRanges[i]);
+    position = tagRanges[i + 1];
+  }
+  return strippedString + str.slice(position);
+}
+
+/**
+ * Whether the string {@link getRawMessage} returns for a token has formatting tags. The tag ranges generated for the
+ * string are looked up, so the string is not parsed.
+ * @param crowdinLocale The locale of the string
+ * @param token The token of the string
+ * @param args The args of the string, the `count` of a plural string selects its form
+ * @returns true if the string has formatting tags
+ */
+export function hasFormattingTags(
+  crowdinLocale: CrowdinLocale,
+  token: MergedLocalizerTokens,
+  args?: Record<string, unknown>
+): boolean {
+  if (
+    typeof window !== 'undefined' &&
+    window?.sessionFeatureFlags?.replaceLocalizedStringsWithKeys
+  ) {
+    return false;
+  }
+  if (isSimpleToken(token)) {
+    return !!getSimpleTagRanges(token, crowdinLocale)?.length;
+  }
+  if (!isPluralToken(token)) {
+    return false;
+  }
+  const num = args && 'count' in args ? Number(args.count) : 0;
+  const cardinalRule = new Intl.PluralRules(crowdinLocale).select(num);
+  return !!getPluralTagRanges(token, crowdinLocale, cardinalRule)?.length;
+}
+
 /**
  * Replaces all html tag identifiers with their escaped equivalents
  * @param str The string to sanitize
@@ -318,23 +385,6 @@ function sanitizeHtmlTags(str: string, identifier: string = ''): string {
     .replace(/>/g, `${identifier}&gt;${identifier}`);
 }
 
-/**
- * Replaces all sanitized html tags with their real equivalents
- * @param str The string to de-sanitize
- * @param identifier The identifier used when the args were sanitized
- * @returns The de-sanitized string
- */
-function deSanitizeHtmlTags(str: string, identifier: string): string {
-  if (!identifier || /[a-zA-Z0-9></\\\-\s]+/g.test(identifier)) {
-    throw new Error('Identifier is not valid');
-  }
-
-  return str
-    .replace(new RegExp(`${identifier}&amp;${identifier}`, 'g'), '&')
-    .replace(new RegExp(`${identifier}&lt;${identifier}`, 'g'), '<')
-    .replace(new RegExp(`${identifier}&gt;${identifier}`, 'g'), '>');
-}
-
 class LocalizedStringBuilder<T extends MergedLocalizerTokens> extends String {
   private readonly token: T;
   private args?: ArgsFromToken<T>;
@@ -358,13 +408,7 @@ class LocalizedStringBuilder<T extends MergedLocalizerTokens> extends String {
       }
 
       const rawString = this.getRawString();
-      const str = this.formatStringWithArgs(rawString);
-
-      if (this.isStripped) {
-        return this.postProcessStrippedString(str);
-      }
-
-      return str;
+      return this.formatStringWithArgs(rawString);
     } catch (error) {
       log(error);
       return this.token;
@@ -381,21 +425,16 @@ class LocalizedStringBuilder<T extends MergedLocalizerTokens> extends String {
     return this;
   }
 
+  /**
+   * Removes the formatting tags of the string. The tags are removed before the args are substituted,
+   * so the args are never mistaken for tags and do not need to be sanitized.
+   */
   strip(): Omit<this, 'strip'> {
-    const sanitizedArgs = this.args ? sanitizeArgs(this.args, '\u200B') : undefined;
-    if (sanitizedArgs) {
-      this.args = sanitizedArgs as ArgsFromToken<T>;
-    }
     this.isStripped = true;
 
     return this;
   }
 
-  private postProcessStrippedString(str: string): string {
-    const strippedString = str.replaceAll(/<[^>]*>/g, '');
-    return deSanitizeHtmlTags(strippedString, '\u200B');
-  }
-
   private localeToTarget(): CrowdinLocale {
     return this.isEnglishForced ? 'en' : this.crowdinLocale;
   }
@@ -407,7 +446,10 @@ class LocalizedStringBuilder<T extends MergedLocalizerTokens> extends String {
       }
 
       if (isSimpleToken(this.token)) {
-        return simpleDictionary[this.token][this.localeToTarget()];
+        const str = simpleDictionary[this.token][this.localeToTarget()];
+        return this.isStripped
+          ? stripTags(str, getSimpleTagRanges(this.token, this.localeToTarget()))
+          : str;
       }
 
       if (!isPluralToken(this.token)) {
@@ -453,6 +495,7 @@ class LocalizedStringBuilder<T extends MergedLocalizerTokens> extends String {
       throw new Error('resolvePluralString can only be called with a plural string');
     }
 
+    let resolvedRule: Intl.LDMLPluralRule = cardinalRule;
     let pluralString = getStringForRule({
       cardinalRule,
       crowdinLocale: localeToTarget,
@@ -465,8 +508,9 @@ class LocalizedStringBuilder<T extends MergedLocalizerTokens> extends String {
         `Plural string not found for cardinal '${cardinalRule}': '${this.token}' Falling back to 'other' cardinal`
       );
 
+      resolvedRule = 'other';
       pluralString = getStringForRule({
-        cardinalRule: 'other',
+        cardinalRule: resolvedRule,
         crowdinLocale: localeToTarget,
         dictionary: pluralsDictionary,
         token: this.token,
@@ -479,6 +523,13 @@ class LocalizedStringBuilder<T extends MergedLocalizerTokens> extends String {
       }
     }
 
+    if (this.isStripped) {
+      pluralString = stripTags(
+        pluralString,
+        getPluralTagRanges(this.token, localeToTarget, resolvedRule)
+      );
+    }
+
     return pluralString.replaceAll('#', `${num}`);
   }
 
@@ -1,6 +1,10 @@
 import { createRoot } from 'react-dom/client';
 import { AboutView } from '../components/AboutView';
+import { loadDeferredLocales } from '../localization/locales';
 
 const container = document.getElementById('root');
 const root = createRoot(container!);
-root.render(<AboutView />);
+// eslint-disable-next-line more/no-then
+void loadDeferredLocales().then(() => {
+  root.render(<AboutView />);
+});
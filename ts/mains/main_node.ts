@@ -165,7 +165,7 @@ import type { SetupI18nReturnType } from '../types/localizer';
 
 import { isSessionLocaleSet, getCrowdinLocale } from '../util/i18n/shared';
 import { loadLocalizedDictionary } from '../node/locale';
-import { simpleDictionary } from '../localization/locales';
+import { loadDeferredLocales, simpleDictionary } from '../localization/locales';
 
 // Both of these will be set after app fires the 'ready' event
 let logger: Logger | null = null;
@@ -732,7 +732,10 @@ app.on('ready', async () => {
   if (dbHasPassword) {
     assertLogger().info('showing password window');
     await showPasswordWindow();
+    // The password window only uses the critical strings, the others are loaded while it is shown
+    await loadDeferredLocales();
   } else {
+    await loadDeferredLocales();
     assertLogger().info('showing main window');
     await showMainWindow(key);
   }
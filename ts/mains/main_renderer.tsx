@@ -31,6 +31,7 @@ import { Storage, isSignInByLinking } from '../util/storage';
 import { getOppositeTheme, isThemeMismatched } from '../util/theme';
 import { getCrowdinLocale } from '../util/i18n/shared';
 import { rtlLocales } from '../localization/constants';
+import { loadDeferredLocales } from '../localization/locales';
 
 // Globally disable drag and drop
 document.body.addEventListener(
@@ -249,6 +250,8 @@ async function manageExpiringData() {
 }
 
 async function start() {
+  // The main window is not shown on startup, so it uses strings that are not in the critical chunk
+  await loadDeferredLocales();
   void manageExpiringData();
   window.dispatchEvent(new Event('storage_ready'));
 
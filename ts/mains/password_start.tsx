@@ -1,6 +1,11 @@
 import { createRoot } from 'react-dom/client';
 import { SessionPasswordPrompt } from '../components/SessionPasswordPrompt';
+import { loadDeferredLocales } from '../localization/locales';
 
 const container = document.getElementById('root');
 const root = createRoot(container!);
 root.render(<SessionPasswordPrompt />);
+// The password prompt only uses the critical strings, the others are loaded once it is shown
+window.requestIdleCallback(() => {
+  void loadDeferredLocales();
+});
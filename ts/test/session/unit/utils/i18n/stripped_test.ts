@@ -29,4 +29,18 @@ describe('stripped', () => {
       'Are you sure you want to promote Alice and Bob to admin? Admins cannot be removed.'
     );
   });
+
+  it('returns the stripped message for a token without stripping the args', () => {
+    const message = initI18n().stripped('messageRequestYouHaveAccepted', {
+      name: '<b>Alice</b> & Bob',
+    });
+    expect(message).to.equal('You have accepted the message request from <b>Alice</b> & Bob.');
+  });
+
+  it('returns the stripped message for a token with a line break tag', () => {
+    const message = initI18n().stripped('accountIdShare', { account_id: '05abc' });
+    expect(message).to.equal(
+      "Hey, I've been using Session to chat with complete privacy and security. Come join me! My Account ID is05abcDownload it at https://getsession.org/download"
+    );
+  });
 });